@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# 效能基準測試：python -m benchmarks.run --help
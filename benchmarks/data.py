@@ -0,0 +1,60 @@
+"""
+合成資料產生器：依指定規模產生與實際檔案格式相同的測試資料。
+"""
+import numpy as np
+import pandas as pd
+
+SCALE_PREFIXES = ["E", "CE", "PP", "FWS", "R"]
+
+
+def survey_data(rows, items, prefixes=SCALE_PREFIXES, missing=0.02, seed=0):
+    """
+    問卷資料：每個前綴一個量表，各 items 題 1~5 分 Likert 題目（含少量缺失值），
+    另有 0/1 分組欄位「組別」。同一量表的題目具相關性，使 alpha 為合理數值。
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for prefix in prefixes:
+        trait = rng.normal(size=rows)
+        for i in range(1, items + 1):
+            score = np.clip(np.round(3 + trait + rng.normal(scale=1.2, size=rows)), 1, 5)
+            score[rng.random(rows) < missing] = np.nan
+            columns[f"{prefix}{i}"] = score
+    columns["組別"] = rng.integers(0, 2, size=rows)
+    return pd.DataFrame(columns)
+
+
+def prefix_names(count, upper=False):
+    """產生 count 個純英文字母前綴：a, b, ..., z, aa, ab, ..."""
+    names = []
+    for p in range(count):
+        name, n = "", p
+        while True:
+            name = chr(97 + n % 26) + name
+            n = n // 26 - 1
+            if n < 0:
+                break
+        names.append(name.upper() if upper else name)
+    return names
+
+
+def prefixed_data(rows, prefixes, items, seed=0):
+    """欄位合併用資料：小寫前綴 + 編號欄位（例 aa1, aa2），整數值"""
+    rng = np.random.default_rng(seed)
+    names = prefix_names(prefixes)
+    data = rng.integers(1, 6, size=(rows, prefixes * items))
+    columns = [f"{name}{i}" for name in names for i in range(1, items + 1)]
+    return pd.DataFrame(data, columns=columns)
+
+
+def panel_data(countries, years, indicators, seed=0):
+    """各國年度面板資料：欄位「國家」「年份」與數個數值指標"""
+    rng = np.random.default_rng(seed)
+    n = countries * years
+    data = {
+        "國家": np.repeat([f"國家{c:03d}" for c in range(countries)], years),
+        "年份": np.tile(np.arange(2000, 2000 + years), countries),
+    }
+    for k in range(indicators):
+        data[f"指標{k + 1}"] = rng.normal(100, 15, size=n)
+    return pd.DataFrame(data)
@@ -0,0 +1,236 @@
+"""
+效能基準測試：以合成資料量測各分析模組的執行時間與記憶體峰值，
+結果可存成 JSON，並與先前的結果比較以找出效能退步。
+
+範例：
+    python -m benchmarks.run --scale small medium -o bench_results.json
+    python -m benchmarks.run --scale medium --compare bench_results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import data
+
+# 各規模的資料大小
+SCALES = {
+    "small": {"rows": 500, "items": 10, "prefixes": 20, "countries": 3, "years": 10, "indicators": 3},
+    "medium": {"rows": 10000, "items": 30, "prefixes": 100, "countries": 10, "years": 30, "indicators": 5},
+    "large": {"rows": 50000, "items": 100, "prefixes": 400, "countries": 30, "years": 50, "indicators": 10},
+}
+
+
+# ------------------------------
+# 各項基準測試：setup(params, workdir) 回傳不計時的準備資料，run(prepared) 為計時部分
+# ------------------------------
+def _reliability_setup(p, workdir):
+    return data.survey_data(p["rows"], p["items"])
+
+
+def _reliability_run(df):
+    from utils.reliability import reliability_analysis
+    reliability_analysis(df)
+
+
+def _ttest_setup(p, workdir):
+    df = data.survey_data(p["rows"], p["items"])
+    return df, [c for c in df.columns if c != "組別"]
+
+
+def _one_sample_run(prepared):
+    from utils.ttest_engine import one_sample_table
+    df, cols = prepared
+    one_sample_table(df, cols)
+
+
+def _independent_run(prepared):
+    from utils.ttest_engine import independent_table
+    df, cols = prepared
+    independent_table(df, "組別", cols)
+
+
+def _paired_run(prepared):
+    from utils.ttest_engine import paired_table
+    df, cols = prepared
+    paired_table(df, cols, "組別")
+
+
+def _transform_setup(p, workdir):
+    df = data.survey_data(p["rows"], p["items"])
+    return df, [c for c in df.columns if c.startswith("R")]
+
+
+def _transform_run(prepared):
+    from utils.data_transformation import transform_columns
+    df, cols = prepared
+    transform_columns(df, cols, {1.0: 5.0, 2.0: 4.0, 4.0: 2.0, 5.0: 1.0})
+
+
+def _merge_setup(p, workdir):
+    return data.prefixed_data(p["rows"], p["prefixes"], 4)
+
+
+def _merge_run(df):
+    from utils.data_process import merge_columns_by_prefix
+    merge_columns_by_prefix(df.copy(deep=False))
+
+
+def _report_setup(p, workdir):
+    panel = data.panel_data(p["countries"], p["years"], p["indicators"])
+    return panel[panel["國家"] == panel["國家"].iloc[0]], workdir
+
+
+def _report_run(prepared):
+    from utils.data_chart import generate_report
+    country_df, workdir = prepared
+    generate_report(country_df, name="bench", base_dir=workdir)
+
+
+def _save_setup(p, workdir):
+    from utils.reliability import reliability_analysis
+    # 結果表格列數 = 題數 × 量表數
+    prefixes = data.prefix_names(p["prefixes"] // 4, upper=True)
+    table = reliability_analysis(data.survey_data(200, p["items"], prefixes=prefixes),
+                                 target_prefixes=set(prefixes))
+    return table, workdir
+
+
+def _make_save_run(ext):
+    def run(prepared):
+        from utils.save_data import write_output
+        table, workdir = prepared
+        write_output(table, os.path.join(workdir, f"bench{ext}"))
+    return run
+
+
+BENCHMARKS = {
+    "reliability_analysis": (_reliability_setup, _reliability_run),
+    "one_sample_ttest": (_ttest_setup, _one_sample_run),
+    "independent_ttest": (_ttest_setup, _independent_run),
+    "paired_ttest": (_ttest_setup, _paired_run),
+    "transform_columns": (_transform_setup, _transform_run),
+    "merge_columns_by_prefix": (_merge_setup, _merge_run),
+    "generate_report": (_report_setup, _report_run),
+    "save_data_xlsx": (_save_setup, _make_save_run(".xlsx")),
+    "save_data_docx": (_save_setup, _make_save_run(".docx")),
+    "save_data_pptx": (_save_setup, _make_save_run(".pptx")),
+}
+
+
+def _reset_caches(workdir=None):
+    """
+    清除分析模組的結果快取（t 檢定的檢定力快取，以及 workdir 中報告的 PDF 圖片快取），
+    讓每次量測都包含完整計算
+    """
+    from utils.ttest_engine import clear_power_cache
+    from utils.pdf_images import PDF_IMAGE_DIR
+    clear_power_cache()
+    if workdir is not None:
+        shutil.rmtree(os.path.join(workdir, "charts", PDF_IMAGE_DIR), ignore_errors=True)
+
+
+def measure(run, prepared, repeat, workdir=None):
+    """
+    回傳 (最短執行秒數, 記憶體峰值 MB)；先暖身一次（載入模組），記憶體另跑一次量測，不影響計時。
+    每次量測前清除結果快取，避免暖身結果使之後只量到快取命中。
+    """
+    run(prepared)
+    times = []
+    for _ in range(repeat):
+        _reset_caches(workdir)
+        gc.collect()
+        start = time.perf_counter()
+        run(prepared)
+        times.append(time.perf_counter() - start)
+
+    _reset_caches(workdir)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(prepared)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1024 ** 2
+
+
+def run_benchmarks(names, scales, repeat=3):
+    results = []
+    for scale in scales:
+        params = SCALES[scale]
+        for name in names:
+            setup, run = BENCHMARKS[name]
+            with tempfile.TemporaryDirectory() as workdir:
+                prepared = setup(params, workdir)
+                seconds, peak_mb = measure(run, prepared, repeat, workdir)
+            results.append({"name": name, "scale": scale, "seconds": seconds, "peak_mb": peak_mb})
+            print(f"{name:<26}{scale:<8}{seconds:>10.4f} s{peak_mb:>10.1f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline_path, threshold, mem_threshold=None):
+    """與基準結果比較，回傳執行時間超過 threshold 倍或記憶體峰值超過 mem_threshold 倍的項目"""
+    mem_threshold = threshold if mem_threshold is None else mem_threshold
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n與 {baseline_path} 比較（時間 > {threshold:.2f} 倍、記憶體 > {mem_threshold:.2f} 倍視為退步）：")
+    for r in results:
+        base = baseline.get((r["name"], r["scale"]))
+        if base is None:
+            continue
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+        mem_ratio = r["peak_mb"] / base["peak_mb"] if base["peak_mb"] > 0 else float("inf")
+        reasons = [k for k, worse in (("時間", ratio > threshold), ("記憶體", mem_ratio > mem_threshold)) if worse]
+        flag = f"⚠️ 退步（{'、'.join(reasons)}）" if reasons else ""
+        print(f"{r['name']:<26}{r['scale']:<8}時間 {ratio:>6.2f}x  記憶體 {mem_ratio:>6.2f}x  {flag}")
+        if reasons:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="分析模組效能基準測試")
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["small"], help="資料規模")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只執行指定項目")
+    parser.add_argument("--repeat", type=int, default=3, help="重複次數（取最短時間）")
+    parser.add_argument("-o", "--output", help="將結果存成 JSON")
+    parser.add_argument("--compare", help="與先前的 JSON 結果比較")
+    parser.add_argument("--threshold", type=float, default=1.2, help="執行時間退步門檻倍數")
+    parser.add_argument("--mem-threshold", type=float, default=None, help="記憶體峰值退步門檻倍數（預設同 --threshold）")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only or list(BENCHMARKS), args.scale, repeat=args.repeat)
+
+    if args.output:
+        record = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scales": {s: SCALES[s] for s in args.scale},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        print(f"\n結果已儲存至：{args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold, args.mem_threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
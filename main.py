@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import messagebox, filedialog, simpledialog
 import utils
 import os
-import pandas as pd
+from utils.job_runner import JobRunner, JobPanel
 
 # ------------------------------
 # 多選欄位對話框（支援 Shift/Ctrl 選取）
@@ -26,6 +26,65 @@ def select_columns_dialog(columns, title="選擇欄位"):
     top.wait_window()
     return selected_cols
 
+# ------------------------------
+# 背景工作（在工作執行緒中執行，不可開啟對話框）
+# ------------------------------
+runner = None
+
+def show_job_error(title):
+    def on_error(e):
+        messagebox.showerror(title, str(e))
+    return on_error
+
+def plain_job(func):
+    """包裝不需回報進度的分析函式"""
+    return lambda job, *args: func(*args)
+
+def reliability_job(job, file_path):
+    from utils.reliability import filter_columns_by_prefix, DEFAULT_PREFIXES
+    job.report(0, 2, "讀取中")
+    df_numeric = utils.read_workbook_numeric(file_path)
+    job.check_cancelled()
+    # 在背景先確認有符合的欄位，避免在工作執行緒中開啟錯誤對話框
+    if not filter_columns_by_prefix(df_numeric, DEFAULT_PREFIXES):
+        return None
+    job.report(1, 2, "計算中")
+    return utils.reliability_analysis(df_numeric)
+
+def batch_reliability_job(job, file_paths):
+    return utils.reliability_analysis_batch(
+        file_paths,
+        progress=lambda done, total, path: job.report(done, total, os.path.basename(path)),
+        cancel=job.cancel_event)
+
+def reports_job(job, file_paths):
+    """逐一產生各檔案的報告；單一檔案失敗時記錄錯誤並繼續下一個檔案，回傳 [(標題, 訊息), ...]"""
+    errors = []
+    for i, file_path in enumerate(file_paths, start=1):
+        job.check_cancelled()
+        prefix = f"[{i}/{len(file_paths)}] " if len(file_paths) > 1 else ""
+        try:
+            utils.generate_file_reports(
+                file_path,
+                progress=lambda done, total, name: job.report(done, total, f"{prefix}{name}"),
+                cancel=job.cancel_event)
+        except FileNotFoundError as e:
+            errors.append(("錯誤", str(e)))
+        except ValueError as e:
+            errors.append(("格式錯誤", str(e)))
+        except RuntimeError as e:
+            errors.append(("報告生成錯誤", f"{file_path}\n{e}"))
+        except Exception as e:
+            errors.append(("讀取錯誤", f"無法讀取檔案：{file_path}\n{e}"))
+    return errors
+
+def batch_transform_job(job, file_paths, rule_sets):
+    from utils.data_transformation import batch_transform
+    return batch_transform(
+        file_paths, rule_sets,
+        progress=lambda done, total, path: job.report(done, total, os.path.basename(path)),
+        cancel=job.cancel_event)
+
 # ------------------------------
 # 原本統計分析功能
 # ------------------------------
@@ -36,31 +95,55 @@ def run_reliability_analysis():
     if ext not in [".xlsx", ".xls"]:
         messagebox.showerror("錯誤", "僅能選擇 Excel 檔案進行分析！")
         return
-    try:
-        df = pd.read_excel(file_path)
-        df_numeric = df.apply(pd.to_numeric, errors='coerce').dropna(how='all')
-    except Exception as e:
-        messagebox.showerror("讀取錯誤", f"無法讀取檔案：{e}")
-        return
-    result_df = utils.reliability_analysis(df_numeric)
-    if result_df.empty:
-        messagebox.showinfo("訊息", "未產生任何結果。")
-        return
-    utils.save_data(df=result_df, original_file_path=file_path)
+
+    def on_done(result_df):
+        if result_df is None:
+            messagebox.showerror("Error", "No columns matched the target prefixes!")
+            return
+        if result_df.empty:
+            messagebox.showinfo("訊息", "未產生任何結果。")
+            return
+        utils.save_data(df=result_df, original_file_path=file_path)
+
+    runner.submit(f"信度分析：{os.path.basename(file_path)}", reliability_job, file_path,
+                  on_done=on_done, on_error=show_job_error("錯誤"))
+
+def run_batch_reliability_analysis():
+    file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案 (批次信度分析)", filetypes=[("Excel Files", "*.xlsx *.xls")])
+    if not file_paths: return
+
+    def on_done(result_df):
+        if result_df.empty:
+            messagebox.showinfo("訊息", "未產生任何結果。")
+            return
+        utils.save_data(df=result_df, original_file_path=file_paths[0])
+
+    runner.submit(f"批次信度分析（{len(file_paths)} 個檔案）", batch_reliability_job, list(file_paths),
+                  on_done=on_done, on_error=show_job_error("錯誤"))
 
 def run_generate_reports():
     file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案", filetypes=[("Excel Files", "*.xlsx *.xls")])
     if not file_paths: return
-    utils.generate_reports(file_paths)
+
+    def on_done(errors):
+        for title, message in errors:
+            messagebox.showerror(title, message)
+        if not errors:
+            messagebox.showinfo("完成", "🎉 所有報告已生成，可於各檔案所在資料夾內查看。")
+
+    runner.submit(f"生成報告（{len(file_paths)} 個檔案）", reports_job, list(file_paths),
+                  on_done=on_done, on_error=show_job_error("報告生成錯誤"))
 
 def run_one_sample_ttest():
     file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案 (單一樣本T檢定)", filetypes=[("Excel Files", "*.xlsx *.xls")])
     if not file_paths: return
     for file_path in file_paths:
-        df = pd.read_excel(file_path)
+        df = utils.read_workbook(file_path)
         value_cols = select_columns_dialog(df.columns.tolist(), title="選擇要分析的欄位")
         if not value_cols: continue
-        utils.one_sample_analysis(file_path, df, value_cols)
+        runner.submit(f"單一樣本T檢定：{os.path.basename(file_path)}",
+                      plain_job(utils.one_sample_analysis), file_path, df, value_cols,
+                      on_error=show_job_error("單一樣本T檢定錯誤"))
 
 def run_independent_ttest():
     file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案 (獨立樣本T檢定)", filetypes=[("Excel Files", "*.xlsx *.xls")])
@@ -68,10 +151,12 @@ def run_independent_ttest():
     group_col = simpledialog.askstring("輸入群組欄位", "請輸入分組變項欄位名稱：")
     if not group_col: return
     for file_path in file_paths:
-        df = pd.read_excel(file_path)
+        df = utils.read_workbook(file_path)
         value_cols = select_columns_dialog(df.columns.tolist(), title="選擇要分析的欄位")
         if not value_cols: continue
-        utils.independent_ttest_analysis(file_path, group_col, value_cols)
+        runner.submit(f"獨立樣本T檢定：{os.path.basename(file_path)}",
+                      plain_job(utils.independent_ttest_analysis), file_path, group_col, value_cols,
+                      on_error=show_job_error("獨立樣本T檢定錯誤"))
 
 def run_paired_ttest():
     file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案 (成對樣本T檢定)", filetypes=[("Excel Files", "*.xlsx *.xls")])
@@ -79,13 +164,24 @@ def run_paired_ttest():
     group_col = simpledialog.askstring("輸入分組欄位", "請輸入分組欄位名稱（用於分組資料對照）:")
     if not group_col: return
     for file_path in file_paths:
-        df = pd.read_excel(file_path)
+        df = utils.read_workbook(file_path)
         target_cols = select_columns_dialog(df.columns.tolist(), title="選擇要做成對T檢定的欄位（多選）")
         if not target_cols: continue
-        utils.paired_ttest_analysis(file_path, target_cols, group_col)
+        runner.submit(f"成對樣本T檢定：{os.path.basename(file_path)}",
+                      plain_job(utils.paired_ttest_analysis), file_path, target_cols, group_col,
+                      on_error=show_job_error("成對樣本T檢定錯誤"))
         
 def run_data_transformation():
     utils.run_transform_process()
+
+def run_batch_data_transformation():
+    from utils.data_transformation import select_batch_transform_inputs, show_batch_transform_summary
+    # 對話框在主執行緒選擇，轉換在背景執行
+    selected = select_batch_transform_inputs()
+    if selected is None: return
+    rule_sets, file_paths = selected
+    runner.submit(f"批次資料轉換（{len(file_paths)} 個檔案）", batch_transform_job, file_paths, rule_sets,
+                  on_done=show_batch_transform_summary, on_error=show_job_error("轉換錯誤"))
     
 def run_merge_process():
     utils.run_merge_process()
@@ -93,26 +189,41 @@ def run_merge_process():
 # ------------------------------
 # GUI 主程式
 # ------------------------------
-root = tk.Tk()
-root.title("統計分析工具")
-root.geometry("450x500")
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("統計分析工具")
+    root.geometry("450x800")
+    runner = JobRunner(root)
+
+    tk.Label(root, text="選擇要執行的功能：", font=("Arial", 12), wraplength=400).pack(pady=10)
+
+    # 按鈕與功能對應
+    functions_dict = {
+        "生成圖表與PDF報告": run_generate_reports,
+        "信度分析 (Reliability Analysis)": run_reliability_analysis,
+        "批次信度分析 (多檔案)": run_batch_reliability_analysis,
+        "單一樣本T檢定 (One-Sample T-Test)": run_one_sample_ttest,
+        "獨立樣本T檢定 (Independent T-Test)": run_independent_ttest,
+        "成對樣本T檢定 (Paired T-Test)": run_paired_ttest,
+        "資料轉換 (多欄多數值)": run_data_transformation,
+        "批次資料轉換 (套用規則檔)": run_batch_data_transformation,
+        "欄位合併 (前綴加總)": run_merge_process
+    }
 
-tk.Label(root, text="選擇要執行的功能：", font=("Arial", 12), wraplength=400).pack(pady=10)
+    for name, func in functions_dict.items():
+        tk.Button(root, text=name, width=40, command=func).pack(pady=5)
 
-# 按鈕與功能對應
-functions_dict = {
-    "生成圖表與PDF報告": run_generate_reports,
-    "信度分析 (Reliability Analysis)": run_reliability_analysis,
-    "單一樣本T檢定 (One-Sample T-Test)": run_one_sample_ttest,
-    "獨立樣本T檢定 (Independent T-Test)": run_independent_ttest,
-    "成對樣本T檢定 (Paired T-Test)": run_paired_ttest,
-    "資料轉換 (多欄多數值)": run_data_transformation,
-    "欄位合併 (前綴加總)": run_merge_process
-}
+    # 背景工作清單：可同時執行多個分析，並可取消
+    tk.Label(root, text="背景工作：").pack(pady=(10, 0))
+    JobPanel(root, runner).pack(fill=tk.BOTH, expand=True, padx=10)
 
-for name, func in functions_dict.items():
-    tk.Button(root, text=name, width=40, command=func).pack(pady=5)
+    def on_close():
+        if runner.active_jobs() and not messagebox.askyesno("確認", "仍有工作執行中，確定要取消並退出嗎？"):
+            return
+        runner.shutdown()
+        root.destroy()
 
-tk.Button(root, text="退出", width=40, command=root.quit).pack(pady=20)
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    tk.Button(root, text="退出", width=40, command=on_close).pack(pady=10)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import (
+    aggregates_path, combine_partials, country_year_partials, means_by_year, region_means, save_partials,
+)
+
+
+def _panel(years, seed):
+    rng = np.random.default_rng(seed)
+    rows = [{"國家": c, "年份": y, "GDP": rng.normal(50, 10), "出生率": rng.normal(10, 2)}
+            for c in ("台灣", "日本", "美國") for y in years]
+    return pd.DataFrame(rows)
+
+
+def test_world_means_match_groupby():
+    df = _panel(range(2000, 2010), 0)
+    df.loc[3, "GDP"] = np.nan
+    expected = df.groupby("年份").mean(numeric_only=True).reset_index()
+    pd.testing.assert_frame_equal(means_by_year(country_year_partials(df)), expected)
+
+
+def test_combine_saved_workbook_aggregates(tmp_path):
+    early, late = _panel(range(2000, 2011), 1), _panel(range(2008, 2020), 2)
+    paths = [save_partials(country_year_partials(df), aggregates_path(str(tmp_path), name))
+             for name, df in (("early", early), ("late", late))]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["early_aggregates.csv", "late_aggregates.csv"]
+
+    combined = combine_partials(paths)
+    pooled = pd.concat([early, late], ignore_index=True)
+    expected = pooled.groupby("年份").mean(numeric_only=True).reset_index()
+    pd.testing.assert_frame_equal(means_by_year(combined), expected, check_exact=False, rtol=1e-12)
+
+    regions = region_means(combined, {"台灣": "亞洲", "日本": "亞洲", "美國": "美洲"})
+    asia = pooled[pooled["國家"].isin(["台灣", "日本"])].groupby("年份").mean(numeric_only=True).reset_index()
+    pd.testing.assert_frame_equal(regions["亞洲"], asia, check_exact=False, rtol=1e-12)
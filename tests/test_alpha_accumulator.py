@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import cli
+from utils.alpha_accumulator import ReliabilityAccumulator
+from utils.reliability import reliability_analysis
+
+
+def _responses(n, seed, items=("E1", "E2", "E3", "R1", "R2", "R3")):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(3, 1, (n, 1))
+    values = np.clip(np.round(base + rng.normal(0, 0.8, (n, len(items)))), 1, 5)
+    return pd.DataFrame(values, columns=list(items))
+
+
+def test_batches_match_full_recompute():
+    df = _responses(300, 0)
+    acc = ReliabilityAccumulator()
+    for start in range(0, len(df), 70):
+        acc.update(df.iloc[start:start + 70])
+    assert acc.table().equals(reliability_analysis(df))
+
+
+def test_failed_batch_leaves_state_unchanged():
+    acc = ReliabilityAccumulator()
+    acc.update(_responses(90, 1), source="first")
+    before = acc.to_dict()
+
+    bad = _responses(40, 2).drop(columns=["R3"])
+    with pytest.raises(ValueError, match="R3"):
+        acc.update(bad, source="bad")
+    assert acc.to_dict() == before
+
+    # 重試同一批也不會重複累加
+    with pytest.raises(ValueError):
+        acc.update(bad, source="bad")
+    assert acc.counts() == {"E": 90, "R": 90}
+
+
+def test_cli_does_not_save_failed_file(tmp_path):
+    state = tmp_path / "state.json"
+    good = tmp_path / "good.xlsx"
+    bad = tmp_path / "bad.xlsx"
+    _responses(90, 3).to_excel(good, index=False)
+    _responses(40, 4).drop(columns=["R3"]).to_excel(bad, index=False)
+    output = str(tmp_path / "out.xlsx")
+
+    assert cli.main(["reliability", str(good), "--state", str(state), "-o", output]) == 0
+    saved = json.loads(state.read_text(encoding="utf-8"))
+
+    for _ in range(2):
+        assert cli.main(["reliability", str(bad), "--state", str(state), "-o", output]) == 1
+        assert json.loads(state.read_text(encoding="utf-8")) == saved
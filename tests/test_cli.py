@@ -0,0 +1,17 @@
+import pandas as pd
+
+from utils import cli
+
+
+def test_folder_inputs_skip_tool_outputs(tmp_path):
+    for name in ("a.xlsx", "b.xlsx", "a_transformed.xlsx", "b_merged.xlsx", "reliability_results.xlsx"):
+        pd.DataFrame({"R1": [1, 5]}).to_excel(tmp_path / name, index=False)
+    assert cli.expand_inputs([str(tmp_path)]) == [str(tmp_path / "a.xlsx"), str(tmp_path / "b.xlsx")]
+    # 明確指定的檔案仍照常處理
+    assert cli.expand_inputs([str(tmp_path / "a_transformed.xlsx")]) == [str(tmp_path / "a_transformed.xlsx")]
+
+    rules = tmp_path / "rules.json"
+    rules.write_text('{"rules": [{"columns": ["R1"], "mapping": {"1": 5, "5": 1}}]}', encoding="utf-8")
+    for _ in range(2):
+        assert cli.main(["transform", str(tmp_path), "--rules", str(rules), "-w", "1"]) == 0
+    assert not list(tmp_path.glob("*_transformed_transformed.xlsx"))
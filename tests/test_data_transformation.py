@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_transformation import transform_columns
+
+
+def _map(df, columns, mapping):
+    result = df.copy()
+    for col in columns:
+        result[col] = result[col].map(lambda x: mapping.get(x, x))
+    return result
+
+
+def test_lookup_matches_map_and_keeps_unmatched_dtype():
+    df = pd.DataFrame({"R1": [1, 2, 3], "R2": [1, 5, 3], "R3": [1.0, np.nan, 2.0]})
+    for mapping in ({7.0: 1.0}, {5.0: 1.0}, {1.0: 5.0, 2.0: 4.0, 4.0: 2.0, 5.0: 1.0}):
+        result = transform_columns(df, list(df.columns), mapping)
+        pd.testing.assert_frame_equal(result, _map(df, list(df.columns), mapping))
+
+    # 沒有代碼符合的整數欄位不升級為浮點數
+    assert transform_columns(df, ["R1"], {7.0: 1.0})["R1"].dtype == np.int64
@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+
+from utils import loader
+
+
+def test_cache_is_per_user_and_cleared_per_file(tmp_path, monkeypatch):
+    monkeypatch.delenv(loader.CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in ("data.xlsx", "data-2024.xlsx"):
+        pd.DataFrame({"E1": [1, 2], "E2": [3, 4]}).to_excel(data_dir / name, index=False)
+        loader.read_workbook(str(data_dir / name))
+
+    cache_dir = tmp_path / "cache" / loader.CACHE_DIR_NAME
+    assert len(os.listdir(cache_dir)) == 2
+    assert sorted(os.listdir(data_dir)) == ["data-2024.xlsx", "data.xlsx"]
+
+    loader.clear_cache(str(data_dir / "data.xlsx"))
+    remaining = os.listdir(cache_dir)
+    assert len(remaining) == 1 and remaining[0].startswith("data-2024-")
@@ -0,0 +1,28 @@
+import os
+
+from PIL import Image
+
+from utils.pdf_images import PDF_IMAGE_DIR, pdf_image_timestamp, prepare_pdf_image, record_pdf_images
+
+
+def _chart(path, color):
+    Image.new("RGBA", (80, 60), color).save(path)
+    return str(path)
+
+
+def test_prune_keeps_images_of_other_workbooks(tmp_path):
+    a = prepare_pdf_image(_chart(tmp_path / "a.png", "red"), 40, 30)
+    b = prepare_pdf_image(_chart(tmp_path / "b.png", "blue"), 40, 30)
+    record_pdf_images(str(tmp_path), "panel.xlsx", [a])
+    record_pdf_images(str(tmp_path), "panel2.xlsx", [b])
+    # 以未來時間為起點，所有圖片都視為本次未使用
+    since = pdf_image_timestamp() + 10
+    # 再次產生 panel.xlsx 不會刪除 panel2.xlsx 用到的圖片
+    assert record_pdf_images(str(tmp_path), "panel.xlsx", [a], since=since) == 0
+    assert os.path.isfile(a) and os.path.isfile(b)
+
+    # panel.xlsx 改用其他圖片後，舊圖片已沒有活頁簿使用
+    c = prepare_pdf_image(_chart(tmp_path / "a.png", "green"), 40, 30)
+    assert record_pdf_images(str(tmp_path), "panel.xlsx", [c], since=since) == 1
+    assert sorted(os.listdir(tmp_path / PDF_IMAGE_DIR)) == sorted(
+        [os.path.basename(b), os.path.basename(c), "index.json"])
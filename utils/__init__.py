@@ -1,11 +1,57 @@
 # utils/__init__.py
 
-# 匯入各功能模組
-from .data_chart import generate_reports
-from .reliability import reliability_analysis
-from .one_sample import one_sample_analysis
-from .independent import independent_ttest_analysis
-from .paired import paired_ttest_analysis
-from .save_data import select_file, save_data
-from .data_transformation import run_transform_process
-from .data_process import run_merge_process
+# 各功能在第一次使用時才匯入對應模組，
+# 啟動時不會載入 matplotlib、seaborn、reportlab、scipy 等大型套件。
+import importlib
+import sys
+import types
+
+_EXPORTS = {
+    "generate_reports": ".data_chart",
+    "generate_file_reports": ".data_chart",
+    "generate_combined_reports": ".data_chart",
+    "reliability_analysis": ".reliability",
+    "reliability_analysis_batch": ".reliability",
+    "ReliabilityAccumulator": ".alpha_accumulator",
+    "one_sample_analysis": ".one_sample",
+    "independent_ttest_analysis": ".independent",
+    "paired_ttest_analysis": ".paired",
+    "select_file": ".save_data",
+    "save_data": ".save_data",
+    "run_transform_process": ".data_transformation",
+    "run_batch_transform_process": ".data_transformation",
+    "run_merge_process": ".data_process",
+    "read_workbook": ".loader",
+    "read_workbook_numeric": ".loader",
+    "enable_tracing": ".instrument",
+    "disable_tracing": ".instrument",
+    "export_trace": ".instrument",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # 快取於套件命名空間，之後的存取不再經過 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # 載入子模組時 import 系統會把同名屬性設為該模組；
+        # save_data 同時是子模組與函式名稱，須保持為函式
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
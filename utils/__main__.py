@@ -0,0 +1,6 @@
+# python -m utils：命令列批次模式
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+各國逐年的部分彙總：以一次 groupby 算出每個 (國家, 年份) 各數值欄位的總和與筆數，
+全球、區域與跨檔案的逐年平均都由這些部分彙總推得，
+成本為 O(國家數 × 年數)，不需再掃描原始資料列。
+
+部分彙總表的欄位為 國家、年份，以及每個數值欄位的 "sum:欄位" 與 "n:欄位"
+（缺失值不計入筆數，與 DataFrame.mean 略過缺失值的結果相同）。
+每個活頁簿的部分彙總存為 {檔名}_aggregates.csv，之後可直接讀取做跨檔案彙總。
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+COUNTRY_COL = "國家"
+YEAR_COL = "年份"
+AGGREGATES_SUFFIX = "_aggregates.csv"
+SUM_PREFIX = "sum:"
+COUNT_PREFIX = "n:"
+
+
+def country_year_partials(df: pd.DataFrame, country_col=COUNTRY_COL, year_col=YEAR_COL):
+    """計算每個 (國家, 年份) 的各數值欄位總和與筆數（缺少國家的資料列也保留，計入全球平均）"""
+    value_cols = [c for c in df.select_dtypes(include=["number", "bool"]).columns
+                  if c not in (country_col, year_col)]
+    grouped = df.groupby([country_col, year_col], sort=False, dropna=False)[value_cols]
+    sums = grouped.sum().astype("float64")
+    counts = grouped.count().astype("int32")
+    partials = pd.concat([sums.add_prefix(SUM_PREFIX), counts.add_prefix(COUNT_PREFIX)], axis=1)
+    return partials.reset_index()
+
+
+def value_columns(partials: pd.DataFrame):
+    """部分彙總表中的原始數值欄位名稱（依原順序）"""
+    return [c[len(SUM_PREFIX):] for c in partials.columns if str(c).startswith(SUM_PREFIX)]
+
+
+def combine_partials(frames, country_col=COUNTRY_COL, year_col=YEAR_COL):
+    """
+    合併多個部分彙總表（例如多個檔案或工作表），相同 (國家, 年份) 的總和與筆數相加。
+    frames 的項目可為 DataFrame 或 save_partials 存的檔案路徑。
+    """
+    frames = [load_partials(f, country_col) if isinstance(f, str) else f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame(columns=[country_col, year_col])
+    combined = pd.concat(frames, ignore_index=True, sort=False)
+    combined = combined.groupby([country_col, year_col], sort=False, dropna=False).sum().reset_index()
+    count_cols = [c for c in combined.columns if str(c).startswith(COUNT_PREFIX)]
+    combined[count_cols] = combined[count_cols].astype("int32")
+    return combined
+
+
+def means_by_year(partials: pd.DataFrame, countries=None, country_col=COUNTRY_COL, year_col=YEAR_COL):
+    """
+    由部分彙總算出逐年平均（countries 為 None 時為全部資料），
+    結果同 df.groupby(年份).mean(numeric_only=True).reset_index()。
+    """
+    if countries is not None:
+        partials = partials[partials[country_col].isin(list(countries))]
+    cols = value_columns(partials)
+    totals = partials.drop(columns=[country_col]).groupby(year_col).sum()
+    sums = totals[[SUM_PREFIX + c for c in cols]].to_numpy(dtype="float64")
+    counts = totals[[COUNT_PREFIX + c for c in cols]].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    result = pd.DataFrame(means, columns=cols, index=totals.index)
+    return result.reset_index()
+
+
+def region_means(partials: pd.DataFrame, regions: dict, country_col=COUNTRY_COL, year_col=YEAR_COL):
+    """依 {國家: 區域} 算出各區域的逐年平均，回傳 {區域: DataFrame}（沒有資料的區域略過）"""
+    members = {}
+    for country, region in regions.items():
+        members.setdefault(region, []).append(country)
+    present = set(partials[country_col].dropna())
+    return {region: means_by_year(partials, countries, country_col, year_col)
+            for region, countries in members.items() if present.intersection(countries)}
+
+
+def load_region_map(path):
+    """
+    讀取國家與區域對照檔，回傳 {國家: 區域}。
+    JSON / YAML 可為 {國家: 區域} 或 {區域: [國家, ...]}；
+    CSV / Excel 取前兩欄（國家、區域）。
+    """
+    lower = path.lower()
+    if lower.endswith((".csv", ".xlsx", ".xls")):
+        table = pd.read_csv(path) if lower.endswith(".csv") else pd.read_excel(path)
+        if table.shape[1] < 2:
+            raise ValueError(f"區域對照檔 {path} 至少需要兩欄（國家、區域）")
+        table = table.iloc[:, :2].dropna()
+        return dict(zip(table.iloc[:, 0], table.iloc[:, 1]))
+
+    with open(path, "r", encoding="utf-8") as f:
+        if lower.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML not installed!")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"區域對照檔 {path} 格式錯誤")
+    regions = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            for country in value:
+                regions[country] = key
+        else:
+            regions[key] = value
+    return regions
+
+
+def aggregates_path(output_dir, name):
+    """name（活頁簿檔名，不含副檔名）的部分彙總檔路徑"""
+    return os.path.join(output_dir, f"{name}{AGGREGATES_SUFFIX}")
+
+
+def save_partials(partials: pd.DataFrame, path):
+    """存成 CSV（浮點數以完整精度寫出），先寫暫存檔再取代"""
+    tmp_path = path + ".tmp"
+    partials.to_csv(tmp_path, index=False, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_partials(path, country_col=COUNTRY_COL):
+    """讀取 save_partials 存的部分彙總表"""
+    partials = pd.read_csv(path, encoding="utf-8", dtype={country_col: object})
+    count_cols = [c for c in partials.columns if str(c).startswith(COUNT_PREFIX)]
+    partials[count_cols] = partials[count_cols].fillna(0).astype("int32")
+    return partials
@@ -0,0 +1,213 @@
+"""
+Incremental Cronbach's alpha from persisted sufficient statistics.
+
+For every scale the accumulator keeps the complete-case count, the item
+means and the centered cross-product (co-moment) matrix. New response
+batches are folded in with the pairwise update of Chan et al. (the batch
+form of Welford's algorithm), so old rows never have to be read again and
+the result matches reliability_table on all rows combined. Accumulators
+can be saved to JSON, loaded and merged (e.g. one per class or per day).
+
+Bootstrap CIs need the raw responses and are not available here.
+
+    acc = ReliabilityAccumulator.load("alpha_state.json")   # or ReliabilityAccumulator()
+    acc.update(new_batch_df, source="responses_0612.xlsx")
+    acc.save("alpha_state.json")
+    table = acc.table()
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+from .loader import read_workbook_numeric
+from .reliability import DEFAULT_PREFIXES, _as_matrix, alpha_from_cov, filter_columns_by_prefix
+
+STATE_VERSION = 1
+
+
+class ScaleAccumulator:
+    """Running count, item means and co-moment matrix for the items of one scale"""
+
+    def __init__(self, items):
+        self.items = list(items)
+        k = len(self.items)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def _combine(self, n_b, mean_b, comoment_b):
+        """Fold in another set of statistics (pairwise update, no raw rows needed)"""
+        if n_b == 0:
+            return
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.comoment = self.comoment + comoment_b + np.outer(delta, delta) * (n_a * n_b / n)
+        self.n = n
+
+    def batch_stats(self, df):
+        """(count, means, co-moment) of a batch, without changing the accumulator"""
+        missing = [c for c in self.items if c not in df.columns]
+        if missing:
+            raise ValueError(f"Batch is missing items: {missing}")
+        values = _as_matrix(df[self.items])
+        if len(values) == 0:
+            return 0, None, None
+        mean_b = values.mean(axis=0)
+        centered = values - mean_b
+        return len(values), mean_b, centered.T @ centered
+
+    def update(self, df):
+        """Add a batch of responses (rows with a missing item are skipped, as in reliability_table)"""
+        n_b, mean_b, comoment_b = self.batch_stats(df)
+        self._combine(n_b, mean_b, comoment_b)
+        return n_b
+
+    def merge(self, other):
+        if other.items != self.items:
+            raise ValueError("Cannot merge accumulators with different items")
+        self._combine(other.n, other.mean, other.comoment)
+        return self
+
+    @property
+    def item_sums(self):
+        return self.mean * self.n
+
+    def covariance(self):
+        """Sample covariance matrix (ddof=1); zeros with fewer than two responses"""
+        if self.n < 2:
+            return np.zeros_like(self.comoment)
+        return self.comoment / (self.n - 1)
+
+    def stats(self):
+        """(alpha, alpha_if_deleted, corrected_item_total_corr), as reliability_stats"""
+        return alpha_from_cov(self.covariance())
+
+    def table(self, scale_name):
+        """Reliability table in the same layout as reliability_table"""
+        alpha_total, alpha_deleted, corr = self.stats()
+        results = []
+        for i, col in enumerate(self.items):
+            first = i == 0
+            results.append({
+                "Scale": scale_name if first else "",
+                "Item": col,
+                "Corrected Item-Total Correlation": round(float(corr[i]), 4),
+                "Cronbach's Alpha if Item Deleted": round(float(alpha_deleted[i]), 4),
+                "Overall Cronbach's Alpha": round(float(alpha_total), 4) if first else "",
+            })
+        return pd.DataFrame(results)
+
+    def to_dict(self):
+        return {"items": [str(c) for c in self.items], "n": self.n,
+                "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls(data["items"])
+        acc.n = int(data["n"])
+        acc.mean = np.asarray(data["mean"], dtype=float)
+        acc.comoment = np.asarray(data["comoment"], dtype=float)
+        return acc
+
+
+class ReliabilityAccumulator:
+    """
+    Per-scale accumulators for a survey. Scales and their items are taken
+    from the first batch (grouped by column prefix like reliability_analysis);
+    later batches must contain the same item columns.
+    """
+
+    def __init__(self, target_prefixes=None):
+        self.target_prefixes = set(target_prefixes or DEFAULT_PREFIXES)
+        self.scales = {}
+        self.sources = []
+
+    def update(self, df, source=None):
+        """
+        Add a batch of new responses. source (e.g. a file name) is recorded,
+        and a batch whose source was already added is skipped so the same
+        responses are not counted twice. Returns {scale: rows added}.
+        The batch is checked against every scale first: if any scale cannot
+        use it, nothing is changed.
+        """
+        if source is not None and source in self.sources:
+            print(f"Skipped {source}: already added")
+            return {}
+        scales = self.scales
+        if not scales:
+            scales = {name: ScaleAccumulator(cols)
+                      for name, cols in filter_columns_by_prefix(df, self.target_prefixes).items()}
+            if not scales:
+                raise ValueError("No columns matched the target prefixes!")
+        batches = {name: acc.batch_stats(df) for name, acc in scales.items()}
+        for name, acc in scales.items():
+            acc._combine(*batches[name])
+        self.scales = scales
+        if source is not None:
+            self.sources.append(source)
+        return {name: batch[0] for name, batch in batches.items()}
+
+    def update_file(self, file_path, all_sheets=False):
+        """
+        Add the responses of a workbook (first sheet, or every sheet with
+        all_sheets=True). The file path (and sheet) is used as the source.
+        If any sheet fails, none of the file's responses are added.
+        """
+        source = os.path.abspath(file_path)
+        if not all_sheets:
+            return self.update(read_workbook_numeric(file_path), source=source)
+        staged = ReliabilityAccumulator.from_dict(self.to_dict())
+        added = {sheet: staged.update(df, source=f"{source}::{sheet}")
+                 for sheet, df in read_workbook_numeric(file_path, sheet_name=None).items()}
+        self.scales, self.sources = staged.scales, staged.sources
+        return added
+
+    def merge(self, other):
+        """Fold another accumulator (e.g. from another class or machine) into this one"""
+        for name, acc in other.scales.items():
+            if name in self.scales:
+                self.scales[name].merge(acc)
+            else:
+                self.scales[name] = ScaleAccumulator.from_dict(acc.to_dict())
+        self.sources.extend(s for s in other.sources if s not in self.sources)
+        return self
+
+    def counts(self):
+        return {name: acc.n for name, acc in self.scales.items()}
+
+    def table(self):
+        """Combined reliability table of all scales, as reliability_analysis returns"""
+        tables = [acc.table(name) for name, acc in self.scales.items()]
+        return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+    def to_dict(self):
+        return {"version": STATE_VERSION, "target_prefixes": sorted(self.target_prefixes),
+                "sources": list(self.sources),
+                "scales": {name: acc.to_dict() for name, acc in self.scales.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported accumulator state version: {data.get('version')}")
+        acc = cls(data.get("target_prefixes"))
+        acc.sources = list(data.get("sources", []))
+        acc.scales = {name: ScaleAccumulator.from_dict(s) for name, s in data["scales"].items()}
+        return acc
+
+    def save(self, path):
+        """Write the state as JSON (temp file + replace, so an interrupted save keeps the old state)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, target_prefixes=None):
+        """Load a saved state; a missing file gives an empty accumulator"""
+        if not os.path.isfile(path):
+            return cls(target_prefixes)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
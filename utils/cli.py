@@ -0,0 +1,332 @@
+"""
+命令列批次執行介面（不開啟任何 tkinter 視窗，可於無桌面的伺服器或排程中使用）。
+
+範例：
+    python -m utils reliability data/ -o reliability_results.xlsx
+    python -m utils independent "data/*.xlsx" --group 組別 --columns E1 E2 E3 --workers 4
+    python -m utils transform data/ --columns R1 R2 --map 1=5 2=4 4=2 5=1
+    python -m utils transform data/ --rules reverse_items.json --workers 4 --side-output csv
+    python -m utils reports data/panel.xlsx --workers 8
+    python -m utils reports data/panel.xlsx --pdf-dpi 100 --jpeg-quality 75
+    python -m utils reports data/ --regions regions.json --combined data/all_files
+    python -m utils reports "data/*_aggregates.csv" new.xlsx --combined data/all_files
+    python -m utils independent classes.xlsx --group 組別 --columns E1 E2 --all-sheets
+    python -m utils reliability data/ --trace trace.csv --profile profiles/
+    python -m utils reliability new_responses.xlsx --state alpha_state.json
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+EXCEL_EXTS = (".xlsx", ".xls")
+# 本工具輸出檔的檔名結尾（*_transformed.xlsx、*_merged.xlsx、reliability_results.xlsx 等）
+OUTPUT_SUFFIXES = ("_transformed", "_merged", "_results")
+
+
+def _is_output_name(file_name):
+    return os.path.splitext(file_name)[0].lower().endswith(OUTPUT_SUFFIXES)
+
+
+def expand_inputs(patterns):
+    """
+    展開檔案路徑、萬用字元與資料夾為 Excel 檔清單（保留順序並去除重複）。
+    資料夾中本工具先前的輸出檔不列入，避免重複執行時再處理自己的輸出。
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                os.path.join(pattern, f) for f in os.listdir(pattern)
+                if f.lower().endswith(EXCEL_EXTS) and not f.startswith("~$") and not _is_output_name(f)
+            )
+        else:
+            # 沒有符合的檔案時保留原字串，讓後續步驟回報找不到檔案
+            matches = sorted(glob.glob(pattern)) or [pattern]
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def _parse_pairs(pairs, key_type=str):
+    """將 ["a=1", "b=2"] 解析為 {a: 1.0, b: 2.0}"""
+    result = {}
+    for pair in pairs or []:
+        if "=" not in pair:
+            raise argparse.ArgumentTypeError(f"格式錯誤（應為 key=value）：{pair}")
+        key, value = pair.split("=", 1)
+        result[key_type(key.strip())] = float(value.strip())
+    return result
+
+
+# ------------------------------
+# 各檔案的工作（需為模組層級函式才能送至子行程）
+# ------------------------------
+def _one_sample_job(file_path, columns, popmeans, side_outputs=None, all_sheets=False):
+    from .loader import read_workbook, read_all_sheets
+    from .one_sample import one_sample_analysis
+    data = read_all_sheets(file_path) if all_sheets else read_workbook(file_path)
+    one_sample_analysis(file_path, data, columns, popmeans or None, side_outputs=side_outputs)
+
+
+def _independent_job(file_path, group_col, columns, side_outputs=None, all_sheets=False):
+    from .independent import independent_ttest_analysis
+    independent_ttest_analysis(file_path, group_col, columns, side_outputs=side_outputs, all_sheets=all_sheets)
+
+
+def _paired_job(file_path, columns, group_col, side_outputs=None, all_sheets=False):
+    from .paired import paired_ttest_analysis
+    paired_ttest_analysis(file_path, columns, group_col, side_outputs=side_outputs, all_sheets=all_sheets)
+
+
+def _transform_job(file_path, columns, mapping, side_outputs=None):
+    from .data_transformation import transform_file
+    print(f"✅ 轉換完成：{transform_file(file_path, columns, mapping, side_outputs=side_outputs)}")
+
+
+def _merge_job(file_path, new_col_prefix, agg, side_outputs=None):
+    from .data_process import merge_file
+    print(f"✅ 欄位合併完成：{merge_file(file_path, new_col_prefix, agg=agg, side_outputs=side_outputs)}")
+
+
+def _run_files(job, file_paths, workers, *args):
+    """對每個檔案執行 job，workers > 1 時以多行程平行處理；回傳失敗檔案數"""
+    failures = 0
+    if workers == 1 or len(file_paths) == 1:
+        for path in file_paths:
+            try:
+                job(path, *args)
+            except Exception as e:
+                failures += 1
+                print(f"⚠️ {path} 處理失敗：{e}", file=sys.stderr)
+        return failures
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(job, path, *args): path for path in file_paths}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failures += 1
+                print(f"⚠️ {futures[future]} 處理失敗：{e}", file=sys.stderr)
+    return failures
+
+
+# ------------------------------
+# 子命令
+# ------------------------------
+def _cmd_reliability(args, file_paths):
+    from .reliability import reliability_analysis_batch, DEFAULT_PREFIXES
+    from .save_data import write_output
+    prefixes = {p.upper() for p in args.prefixes} if args.prefixes else DEFAULT_PREFIXES
+    if args.state:
+        return _reliability_state(args, file_paths, prefixes)
+    result = reliability_analysis_batch(file_paths, prefixes, max_workers=args.workers,
+                                        n_boot=args.bootstrap, seed=args.seed, all_sheets=args.all_sheets)
+    if result.empty:
+        print("⚠️ 未產生任何結果。", file=sys.stderr)
+        return 1
+    output = args.output or os.path.join(os.path.dirname(file_paths[0]), "reliability_results.xlsx")
+    write_output(result, output, rows_per_table=args.rows_per_table, rows_per_slide=args.rows_per_slide,
+                 side_outputs=args.side_output)
+    print(f"✅ 信度分析結果已輸出至：{output}")
+    return 0
+
+
+def _reliability_state(args, file_paths, prefixes):
+    """將新檔案的作答累加至狀態檔，輸出所有已累加資料的信度分析結果（不重讀舊資料）"""
+    from .alpha_accumulator import ReliabilityAccumulator
+    from .save_data import write_output
+    if args.bootstrap:
+        raise argparse.ArgumentTypeError("--state 不支援 --bootstrap（信賴區間需要原始資料）")
+    acc = ReliabilityAccumulator.load(args.state, prefixes)
+    failures = 0
+    for path in file_paths:
+        # 失敗的檔案不會改變累加狀態（update_file 全部成功才套用）
+        try:
+            acc.update_file(path, all_sheets=args.all_sheets)
+        except Exception as e:
+            failures += 1
+            print(f"⚠️ {path} 處理失敗：{e}", file=sys.stderr)
+    if not acc.scales:
+        print("⚠️ 未產生任何結果。", file=sys.stderr)
+        return 1
+    if failures == len(file_paths):
+        print("⚠️ 所有檔案皆處理失敗，累加狀態未更新。", file=sys.stderr)
+        return failures
+    acc.save(args.state)
+    counts = "、".join(f"{name} {n} 筆" for name, n in acc.counts().items())
+    print(f"✅ 累加狀態已更新：{args.state}（{counts}）")
+    output = args.output or os.path.join(os.path.dirname(file_paths[0]), "reliability_results.xlsx")
+    write_output(acc.table(), output, rows_per_table=args.rows_per_table, rows_per_slide=args.rows_per_slide,
+                 side_outputs=args.side_output)
+    print(f"✅ 信度分析結果已輸出至：{output}")
+    return failures
+
+
+def _cmd_one_sample(args, file_paths):
+    return _run_files(_one_sample_job, file_paths, args.workers, args.columns, _parse_pairs(args.popmean),
+                      args.side_output, args.all_sheets)
+
+
+def _cmd_independent(args, file_paths):
+    return _run_files(_independent_job, file_paths, args.workers, args.group, args.columns, args.side_output,
+                      args.all_sheets)
+
+
+def _cmd_paired(args, file_paths):
+    return _run_files(_paired_job, file_paths, args.workers, args.columns, args.group, args.side_output,
+                      args.all_sheets)
+
+
+def _cmd_transform(args, file_paths):
+    if args.rules:
+        from .data_transformation import load_rules, batch_transform
+        results = batch_transform(file_paths, load_rules(args.rules), max_workers=args.workers,
+                                  side_outputs=args.side_output)
+        failures = 0
+        for path, result in results.items():
+            if isinstance(result, Exception):
+                failures += 1
+                print(f"⚠️ {path} 處理失敗：{result}", file=sys.stderr)
+            else:
+                print(f"✅ 轉換完成：{result}")
+        return failures
+    if not args.columns or not args.map:
+        raise argparse.ArgumentTypeError("請指定 --rules，或同時指定 --columns 與 --map")
+    return _run_files(_transform_job, file_paths, args.workers, args.columns, _parse_pairs(args.map, float),
+                      args.side_output)
+
+
+def _cmd_merge(args, file_paths):
+    return _run_files(_merge_job, file_paths, args.workers, args.prefix, args.agg, args.side_output)
+
+
+def _cmd_reports(args, file_paths):
+    from .data_chart import generate_file_reports, generate_combined_reports
+    from .aggregates import load_region_map
+    pdf_images = {"dpi": args.pdf_dpi or None, "format": args.pdf_image_format, "quality": args.jpeg_quality}
+    regions = load_region_map(args.regions) if args.regions else None
+    # 已存的部分彙總檔（{檔名}_aggregates.csv）直接用於跨檔案彙總，不重新讀取活頁簿
+    partials = [path for path in file_paths if path.lower().endswith(".csv")]
+    if partials and not args.combined:
+        raise argparse.ArgumentTypeError("輸入彙總檔（.csv）時須同時指定 --combined")
+    failures = 0
+    # 檔案依序處理，各檔案內的國家報告由 workers 個行程平行繪製
+    for path in file_paths:
+        if path.lower().endswith(".csv"):
+            continue
+        try:
+            partials.append(generate_file_reports(path, max_workers=args.workers, use_cache=not args.no_cache,
+                                                  all_sheets=args.all_sheets, pdf_images=pdf_images,
+                                                  regions=regions))
+        except Exception as e:
+            failures += 1
+            print(f"⚠️ {path} 處理失敗：{e}", file=sys.stderr)
+    if args.combined and partials:
+        # 跨檔案的全球與區域平均只由各檔案的部分彙總推得，不重新讀取資料
+        try:
+            generate_combined_reports(partials, args.combined, regions=regions, max_workers=args.workers,
+                                      use_cache=not args.no_cache, pdf_images=pdf_images)
+        except Exception as e:
+            failures += 1
+            print(f"⚠️ 跨檔案彙總失敗：{e}", file=sys.stderr)
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils", description="統計分析工具（命令列批次模式）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, help_text, side_output=True, all_sheets=True):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("inputs", nargs="+", help="Excel 檔案、萬用字元或資料夾")
+        p.add_argument("-w", "--workers", type=int, default=None, help="平行行程數（1 表示不平行）")
+        p.add_argument("--trace", metavar="PATH", help="記錄各階段耗時與資料大小並輸出（.json 或 .csv）")
+        p.add_argument("--profile", metavar="DIR", help="以 cProfile 剖析每次分析，.prof 檔存於此資料夾")
+        if side_output:
+            p.add_argument("--side-output", nargs="+", choices=["csv", "parquet"], default=None,
+                           help="另存結果副本（CSV / Parquet，Parquet 需安裝 pyarrow）")
+        if all_sheets:
+            p.add_argument("--all-sheets", action="store_true",
+                           help="分析每個工作表與全部工作表合併的資料（活頁簿只解析一次）")
+        p.set_defaults(func=func)
+        return p
+
+    p = add_command("reliability", _cmd_reliability, "信度分析 (Cronbach's Alpha)")
+    p.add_argument("-o", "--output", help="合併結果輸出路徑（.xlsx/.docx/.pptx）")
+    p.add_argument("--rows-per-table", type=int, default=None, help="Word 輸出時每個表格的最多列數")
+    p.add_argument("--rows-per-slide", type=int, default=None, help="PowerPoint 輸出時每張投影片的列數")
+    p.add_argument("--prefixes", nargs="+", help="量表欄位前綴（預設 E CE PP FWS R）")
+    p.add_argument("--bootstrap", type=int, default=0, help="bootstrap 次數（0 表示不計算信賴區間）")
+    p.add_argument("--seed", type=int, default=None, help="bootstrap 亂數種子")
+    p.add_argument("--state", metavar="PATH",
+                   help="累加狀態檔（JSON）：只讀取新檔案並更新狀態，結果涵蓋所有已累加的作答")
+
+    p = add_command("one-sample", _cmd_one_sample, "單一樣本 t 檢定")
+    p.add_argument("--columns", nargs="+", required=True, help="要分析的欄位")
+    p.add_argument("--popmean", nargs="+", metavar="COL=VALUE", help="各欄位母體平均數（預設為欄位平均數）")
+
+    p = add_command("independent", _cmd_independent, "獨立樣本 t 檢定")
+    p.add_argument("--group", required=True, help="分組欄位名稱")
+    p.add_argument("--columns", nargs="+", required=True, help="要分析的欄位")
+
+    p = add_command("paired", _cmd_paired, "成對樣本 t 檢定")
+    p.add_argument("--group", default=None, help="分組欄位名稱（可省略）")
+    p.add_argument("--columns", nargs="+", required=True, help="要做成對 t 檢定的欄位")
+
+    p = add_command("transform", _cmd_transform, "資料轉換（數值重新編碼）", all_sheets=False)
+    p.add_argument("--rules", help="規則檔（JSON/YAML），可包含多組欄位與轉換規則")
+    p.add_argument("--columns", nargs="+", help="要轉換的欄位")
+    p.add_argument("--map", nargs="+", metavar="OLD=NEW", help="轉換規則，例：1=5 2=4")
+
+    p = add_command("merge", _cmd_merge, "欄位合併（前綴加總）", all_sheets=False)
+    p.add_argument("--prefix", default=None, help="合併後新欄位名稱前綴（預設使用原前綴）")
+    p.add_argument("--agg", choices=["sum", "mean", "count"], default="sum", help="彙總方式（預設加總）")
+
+    p = add_command("reports", _cmd_reports, "生成圖表與 PDF 報告", side_output=False)
+    p.add_argument("--no-cache", action="store_true", help="忽略圖表快取，全部重新繪製")
+    p.add_argument("--pdf-dpi", type=int, default=150, help="PDF 內圖片的解析度（預設 150，0 表示不縮小）")
+    p.add_argument("--pdf-image-format", choices=["jpeg", "png"], default="jpeg",
+                   help="PDF 內圖片格式（jpeg 較小且不需重新編碼；png 為無損）")
+    p.add_argument("--jpeg-quality", type=int, default=85, help="JPEG 品質 1-95（預設 85）")
+    p.add_argument("--regions", metavar="PATH", help="國家與區域對照檔（JSON/YAML/CSV/Excel），另產生各區域平均報告")
+    p.add_argument("--combined", metavar="DIR",
+                   help="另將所有檔案合併，產生跨檔案的全球與區域平均報告至此資料夾；"
+                        "輸入可包含先前存的 *_aggregates.csv（不重新讀取該活頁簿）")
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    file_paths = expand_inputs(args.inputs)
+    if not file_paths:
+        parser.error("找不到任何 Excel 檔案")
+    if not (args.trace or args.profile):
+        return _run_command(parser, args, file_paths)
+
+    from . import instrument
+    # 子行程的紀錄寫入暫存資料夾，結束後合併輸出
+    spool_dir = tempfile.mkdtemp(prefix="elearning_trace_")
+    instrument.enable_tracing(spool_dir=spool_dir, profile_dir=args.profile)
+    try:
+        return _run_command(parser, args, file_paths)
+    finally:
+        if args.trace:
+            instrument.export_trace(args.trace)
+            print(f"✅ 效能紀錄已輸出至：{args.trace}")
+        instrument.disable_tracing()
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def _run_command(parser, args, file_paths):
+    try:
+        return 1 if args.func(args, file_paths) else 0
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
@@ -1,25 +1,97 @@
 import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
+from reportlab import rl_config
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.pagesizes import A4
-import tkinter as tk
-from tkinter import filedialog, messagebox
+from .loader import read_workbook, read_all_sheets
+from .instrument import trace_run, stage
+from .sheets import pool_sheets, safe_sheet_name
+from .aggregates import (
+    aggregates_path, country_year_partials, combine_partials, means_by_year, region_means,
+    load_region_map, save_partials,
+)
+from .pdf_images import image_options, prepare_pdf_image, record_pdf_images, pdf_image_timestamp
 
 # ====== 字型設定 ======
-plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei']
-plt.rcParams['axes.unicode_minus'] = False
+matplotlib.rcParams['font.sans-serif'] = ['Microsoft JhengHei']
+matplotlib.rcParams['axes.unicode_minus'] = False
 
+# ====== PDF 設定 ======
+# 圖片串流直接以二進位寫入，不再以 ASCII85 編碼（ASCII85 會使圖片大 25%）
+rl_config.useA85 = 0
 
-def generate_report(data: pd.DataFrame, name: str, base_dir: str, is_global=False):
-    """根據表格欄位動態生成圖表與PDF報告"""
-    prefix = "World" if is_global else name
-    charts_dir = os.path.join(base_dir, "charts")
-    reports_dir = os.path.join(base_dir, "reports")
-    os.makedirs(charts_dir, exist_ok=True)
-    os.makedirs(reports_dir, exist_ok=True)
+# ====== 圖表快取設定 ======
+CHART_MANIFEST = "charts_manifest.json"
+# 繪圖程式碼改變時遞增，使舊快取失效
+CHART_CACHE_VERSION = 1
+LINE_FIGSIZE = (8, 5)
+SCATTER_FIGSIZE = (6, 5)
+# 圖表在 PDF 中的顯示大小（點）
+PDF_IMAGE_SIZE = (400, 300)
+# 區域報告名稱的前綴，避免與國家名稱相同
+REGION_PREFIX = "區域_"
+
+
+def _new_figure(figsize):
+    """建立不經過 pyplot 全域狀態的 Agg 圖表"""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _chart_digest(data: pd.DataFrame, cols, kind: str, title: str, figsize):
+    """以資料切片、欄位、圖表類型與繪圖設定計算圖表內容雜湊"""
+    settings = [
+        CHART_CACHE_VERSION, kind, title, [str(c) for c in cols], list(figsize),
+        matplotlib.rcParams['savefig.dpi'], matplotlib.rcParams['figure.dpi'],
+        list(matplotlib.rcParams['font.sans-serif']), matplotlib.__version__, sns.__version__,
+    ]
+    h = hashlib.sha256(json.dumps(settings, ensure_ascii=False, default=str).encode("utf-8"))
+    subset = data[list(cols)]
+    h.update(str(subset.dtypes.tolist()).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(subset, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def load_chart_manifest(base_dir: str):
+    """讀取 charts/ 旁的圖表快取清單 {圖檔名稱: 雜湊}"""
+    path = os.path.join(base_dir, CHART_MANIFEST)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_chart_manifest(base_dir: str, manifest: dict):
+    """寫入圖表快取清單（先寫暫存檔再取代，避免中斷時損毀）"""
+    path = os.path.join(base_dir, CHART_MANIFEST)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def render_charts(data: pd.DataFrame, prefix: str, charts_dir: str, cache=None):
+    """
+    以 Agg 物件導向 API 繪製所有圖表，回傳 (圖檔路徑, 快取清單項目)。
+    cache 為先前的 {圖檔名稱: 雜湊}；雜湊相同且圖檔仍存在時直接沿用舊圖。
+    """
+    cache = cache or {}
+    entries = {}
+
+    def is_cached(img_path, digest):
+        file_name = os.path.basename(img_path)
+        entries[file_name] = digest
+        return cache.get(file_name) == digest and os.path.isfile(img_path)
 
     # ====== 自動偵測數值欄位 ======
     numeric_cols = data.select_dtypes(include='number').columns.tolist()
@@ -30,36 +102,67 @@ def generate_report(data: pd.DataFrame, name: str, base_dir: str, is_global=Fals
 
     # ====== 為每個欄位繪圖 ======
     for col in numeric_cols:
-        plt.figure(figsize=(8, 5))
+        title = f"{prefix}：{col} 變化趨勢"
+        img_path = os.path.join(charts_dir, f"{prefix}_{col}.png")
         try:
+            if is_cached(img_path, _chart_digest(data, ['年份', col], "line", title, LINE_FIGSIZE)):
+                image_paths.append(img_path)
+                continue
+            fig, ax = _new_figure(LINE_FIGSIZE)
             # 折線圖（年份為橫軸）
-            sns.lineplot(data=data, x='年份', y=col, marker="o")
-            plt.title(f"{prefix}：{col} 變化趨勢")
-            plt.tight_layout()
-            img_path = os.path.join(charts_dir, f"{prefix}_{col}.png")
-            plt.savefig(img_path)
-            plt.close()
+            sns.lineplot(data=data, x='年份', y=col, marker="o", ax=ax)
+            ax.set_title(title)
+            fig.tight_layout()
+            fig.savefig(img_path)
             image_paths.append(img_path)
         except Exception as e:
+            entries.pop(os.path.basename(img_path), None)
             print(f"⚠️ 無法繪製欄位 {col}: {e}")
-            plt.close()
 
     # ====== 若至少有兩個數值欄位，嘗試繪製散點關係圖 ======
     if len(numeric_cols) >= 2:
         x_col = numeric_cols[0]
         for y_col in numeric_cols[1:]:
-            plt.figure(figsize=(6, 5))
-            sns.scatterplot(data=data, x=x_col, y=y_col)
-            plt.title(f"{prefix}：{x_col} 與 {y_col} 關係圖")
-            plt.tight_layout()
+            title = f"{prefix}：{x_col} 與 {y_col} 關係圖"
             img_path = os.path.join(charts_dir, f"{prefix}_{x_col}_vs_{y_col}.png")
-            plt.savefig(img_path)
-            plt.close()
             image_paths.append(img_path)
+            if is_cached(img_path, _chart_digest(data, [x_col, y_col], "scatter", title, SCATTER_FIGSIZE)):
+                continue
+            fig, ax = _new_figure(SCATTER_FIGSIZE)
+            sns.scatterplot(data=data, x=x_col, y=y_col, ax=ax)
+            ax.set_title(title)
+            fig.tight_layout()
+            fig.savefig(img_path)
+
+    return image_paths, entries
+
+
+def generate_report(data: pd.DataFrame, name: str, base_dir: str, is_global=False, cache=None, pdf_images=None):
+    """
+    根據表格欄位動態生成圖表與PDF報告，回傳 (本次圖表的快取清單項目, PDF 所用的圖片路徑)。
+    pdf_images 為 PDF 內圖片的設定（見 pdf_images.PDF_IMAGE_OPTIONS），例如 {"dpi": 100}。
+    """
+    prefix = "World" if is_global else name
+    charts_dir = os.path.join(base_dir, "charts")
+    reports_dir = os.path.join(base_dir, "reports")
+    os.makedirs(charts_dir, exist_ok=True)
+    os.makedirs(reports_dir, exist_ok=True)
 
-    # ====== PDF 報告 ======
     pdf_name = "全球總覽報告.pdf" if is_global else f"{name}_報告.pdf"
     pdf_path = os.path.join(reports_dir, pdf_name)
+    with trace_run("generate_report", pdf_path) as run:
+        run.record(data)
+        with stage("render"):
+            image_paths, entries = render_charts(data, prefix, charts_dir, cache=cache)
+        with stage("write"):
+            pdf_image_paths = _build_pdf(pdf_path, data, name, is_global, image_paths, pdf_images)
+
+    print(f"✅ 已生成報告 → {pdf_path}")
+    return entries, pdf_image_paths
+
+
+def _build_pdf(pdf_path, data, name, is_global, image_paths, pdf_images=None):
+    """以 reportlab 組成 PDF 報告（圖片先依 pdf_images 設定縮小壓縮），回傳嵌入的圖片路徑"""
     doc = SimpleDocTemplate(pdf_path, pagesize=A4)
     styles = getSampleStyleSheet()
     story = []
@@ -72,8 +175,10 @@ def generate_report(data: pd.DataFrame, name: str, base_dir: str, is_global=Fals
     story.append(Paragraph("以下圖表依據資料欄位自動生成：", styles["Normal"]))
     story.append(Spacer(1, 20))
 
-    for img_path in image_paths:
-        story.append(Image(img_path, width=400, height=300))
+    width, height = PDF_IMAGE_SIZE
+    pdf_image_paths = [prepare_pdf_image(img_path, width, height, pdf_images) for img_path in image_paths]
+    for pdf_image_path in pdf_image_paths:
+        story.append(Image(pdf_image_path, width=width, height=height))
         story.append(Spacer(1, 20))
 
     if not image_paths:
@@ -81,12 +186,264 @@ def generate_report(data: pd.DataFrame, name: str, base_dir: str, is_global=Fals
 
     story.append(Paragraph("報告生成完畢。", styles["Italic"]))
     doc.build(story)
+    return pdf_image_paths
 
-    print(f"✅ 已生成報告 → {pdf_path}")
+
+def iter_country_frames(df: pd.DataFrame, country_col='國家'):
+    """以單次 groupby 分割資料，依首次出現順序逐一產生 (國家, 該國資料)"""
+    for country, country_df in df.groupby(country_col, sort=False, dropna=True):
+        yield country, country_df
+
+
+def _summary_jobs(partials: pd.DataFrame, base_dir: str, regions=None):
+    """由各國逐年部分彙總產生全球與各區域平均的報告工作 (data, name, base_dir, is_global)"""
+    # === 全球平均 ===
+    jobs = [(means_by_year(partials), "World", base_dir, True)]
+    # === 區域平均 ===
+    for region, region_data in region_means(partials, regions or {}).items():
+        jobs.append((region_data, f"{REGION_PREFIX}{region}", base_dir, False))
+    return jobs
 
 
-def generate_reports(file_paths):
-    """主流程：支援多檔案分析"""
+def _report_jobs(df: pd.DataFrame, base_dir: str, summary_jobs):
+    """逐一產生各國報告工作，最後為全球與區域報告工作"""
+    for country, country_df in iter_country_frames(df):
+        yield country_df, country, base_dir, False
+    yield from summary_jobs
+
+
+def _generate_reports_parallel(jobs, max_workers=None, manifests=None, progress=None, cancel=None,
+                               pdf_images=None, used_images=None):
+    """
+    將各國報告 (data, name, base_dir, is_global) 分派到多個行程同時繪製。
+    jobs 可為產生器：同時送出的工作數有上限，資料不需一次全部切好。
+    manifests 為 {base_dir: 圖表快取清單}；各報告只收到自己資料夾與前綴的項目，
+    完成後合併回對應的清單。used_images 為 {base_dir: set()}，收集各資料夾 PDF 所用的圖片。
+    progress(已完成數, 報告名稱) 於每份報告完成後呼叫；cancel（threading.Event）
+    被設定後不再送出新的報告，尚未開始的報告也會取消。
+    單一報告失敗時繼續產生其餘報告。
+    回傳 (是否所有報告都已送出（未被取消）, [(失敗的報告名稱, 例外), ...])。
+    """
+    completed = 0
+    failures = []
+
+    def cache_for(name, base_dir, is_global):
+        manifest = (manifests or {}).get(base_dir)
+        if manifest is None:
+            return None
+        prefix = f"{'World' if is_global else name}_"
+        return {k: v for k, v in manifest.items() if k.startswith(prefix)}
+
+    def finish(name):
+        nonlocal completed
+        completed += 1
+        if progress is not None:
+            progress(completed, name)
+
+    def collect(result, name, base_dir):
+        entries, pdf_image_paths = result
+        manifest = (manifests or {}).get(base_dir)
+        if manifest is not None and entries:
+            manifest.update(entries)
+        if used_images is not None:
+            used_images.setdefault(base_dir, set()).update(pdf_image_paths)
+        finish(name)
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    def failed(name, e):
+        print(f"⚠️ 無法生成 {name} 報告: {e}")
+        failures.append((name, e))
+        finish(name)
+
+    if max_workers == 1:
+        for data, name, base_dir, is_global in jobs:
+            if cancelled():
+                return False, failures
+            try:
+                result = generate_report(data, name=name, base_dir=base_dir, is_global=is_global,
+                                         cache=cache_for(name, base_dir, is_global), pdf_images=pdf_images)
+            except Exception as e:
+                failed(name, e)
+                continue
+            collect(result, name, base_dir)
+        return True, failures
+
+    def drain(futures, return_when):
+        done, _ = wait(futures, return_when=return_when)
+        for future in done:
+            if not future.cancelled():
+                name, base_dir = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed(name, e)
+                else:
+                    collect(result, name, base_dir)
+            del futures[future]
+
+    max_pending = 2 * (max_workers or os.cpu_count() or 1)
+    stopped = False
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for data, name, base_dir, is_global in jobs:
+            if len(futures) >= max_pending:
+                drain(futures, FIRST_COMPLETED)
+            if cancelled():
+                stopped = True
+                for future in futures:
+                    future.cancel()
+                break
+            future = pool.submit(generate_report, data, name, base_dir, is_global,
+                                 cache_for(name, base_dir, is_global), pdf_images)
+            futures[future] = (name, base_dir)
+        if futures:
+            drain(futures, ALL_COMPLETED)
+    return not stopped, failures
+
+
+def _run_report_jobs(jobs, dirs, total, owner, max_workers=None, use_cache=True, progress=None, cancel=None,
+                     pdf_images=None, started=None):
+    """
+    執行報告工作並更新 dirs 中各資料夾的圖表快取清單，並記錄 owner（活頁簿或彙總名稱）
+    所用的 PDF 圖片；全部完成（未被取消）時刪除各資料夾中已沒有任何活頁簿使用的 PDF 圖片。
+    有報告失敗時，其餘報告完成後拋出 RuntimeError 列出失敗的報告。
+    """
+    manifests = {d: load_chart_manifest(d) if use_cache else None for d in dirs}
+    used_images = {}
+    # 各國報告的繪圖與 PDF 細項記錄在各自的 generate_report 紀錄中
+    report_progress = None
+    if progress is not None:
+        report_progress = lambda done, name: progress(done, total, name)
+    with stage("render"):
+        finished, failures = _generate_reports_parallel(jobs, max_workers=max_workers, manifests=manifests,
+                                              progress=report_progress, cancel=cancel,
+                                              pdf_images=pdf_images, used_images=used_images)
+    with stage("write"):
+        if use_cache:
+            for d, manifest in manifests.items():
+                os.makedirs(d or os.curdir, exist_ok=True)
+                save_chart_manifest(d, manifest)
+        # 有報告失敗時不刪除圖片（失敗報告先前用的圖片仍可沿用）
+        for d in dirs:
+            record_pdf_images(os.path.join(d, "charts"), owner, used_images.get(d, ()),
+                              since=started if finished and not failures else None)
+    if failures:
+        details = "\n".join(f"{name}：{e}" for name, e in failures)
+        raise RuntimeError(f"{len(failures)} 份報告生成失敗：\n{details}")
+
+
+def generate_file_reports(file_path, max_workers=None, use_cache=True, progress=None, cancel=None,
+                          all_sheets=False, pdf_images=None, regions=None):
+    """
+    產生單一 Excel 檔的各國與全球報告（不使用對話框，錯誤以例外拋出），
+    報告輸出於檔案所在資料夾。
+    progress(已完成數, 報告總數, 報告名稱) 於每份報告完成後呼叫；
+    cancel 為 threading.Event，設定後停止產生其餘報告（已完成的報告保留）。
+    all_sheets 為 True 時只解析活頁簿一次：各工作表的報告輸出至 {檔名}_{工作表}/，
+    所有工作表合併後的報告輸出至檔案所在資料夾，全部報告由同一個行程池同時繪製。
+    pdf_images 為 PDF 內圖片的解析度與壓縮設定；所有報告完成後，
+    charts/pdf_images/ 中已沒有任何活頁簿報告使用的圖片會被刪除。
+    全球（與 regions 對照的各區域）平均由各國逐年部分彙總推得，彙總表另存為
+    輸出資料夾中的 {檔名}_aggregates.csv。regions 為 {國家: 區域} 或對照檔路徑。
+    回傳檔案所在資料夾報告所用的部分彙總表，可交給 generate_combined_reports 做跨檔案彙總。
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"找不到檔案：{file_path}")
+
+    base_dir = os.path.dirname(file_path)
+    file_name = os.path.basename(file_path)
+
+    if not file_path.lower().endswith(('.xlsx', '.xls')):
+        raise ValueError(f"{file_name} 不是 Excel 檔案！")
+
+    pdf_images = image_options(pdf_images)
+    if isinstance(regions, str):
+        regions = load_region_map(regions)
+    started = pdf_image_timestamp()
+    with trace_run("generate_file_reports", file_path) as run:
+        with stage("read"):
+            if all_sheets:
+                sheets = read_all_sheets(file_path)
+            else:
+                sheets = {None: read_workbook(file_path)}
+
+        # 要產生報告的資料：{輸出資料夾: DataFrame}
+        targets = {}
+        with stage("clean"):
+            base_name = os.path.splitext(file_name)[0]
+            for sheet, df in sheets.items():
+                if '國家' not in df.columns:
+                    if not all_sheets:
+                        raise ValueError(f"檔案 {file_name} 缺少『國家』欄位！")
+                    print(f"⚠️ 工作表 {sheet} 缺少『國家』欄位，已略過")
+                    continue
+                targets[base_dir if sheet is None else
+                        os.path.join(base_dir, f"{base_name}_{safe_sheet_name(sheet)}")] = df
+            if not targets:
+                raise ValueError(f"檔案 {file_name} 的工作表皆缺少『國家』欄位！")
+            pooled = all_sheets and len(targets) > 1
+            if pooled:
+                targets[base_dir] = pool_sheets(list(targets.values()))
+        run.record(rows=sum(len(df) for df in sheets.values()),
+                   columns=max(df.shape[1] for df in sheets.values()))
+
+        # 每份資料只彙總一次；合併全部工作表時直接相加各工作表的部分彙總
+        with stage("compute"):
+            partials = {d: country_year_partials(df) for d, df in targets.items()
+                        if not (pooled and d == base_dir)}
+            if pooled:
+                partials[base_dir] = combine_partials(list(partials.values()))
+            for d, p in partials.items():
+                os.makedirs(d or os.curdir, exist_ok=True)
+                # 同一資料夾可能有多個活頁簿：以活頁簿（與工作表）名稱區分
+                save_partials(p, aggregates_path(d, base_name if d == base_dir else os.path.basename(d)))
+            summaries = {d: _summary_jobs(partials[d], d, regions) for d in targets}
+
+        total = sum(df['國家'].nunique() + len(summaries[d]) for d, df in targets.items())
+        jobs = (job for d, df in targets.items() for job in _report_jobs(df, d, summaries[d]))
+        _run_report_jobs(jobs, list(targets), total, file_name, max_workers=max_workers, use_cache=use_cache,
+                         progress=progress, cancel=cancel, pdf_images=pdf_images, started=started)
+    # 只有一個工作表有資料時沒有合併的報告，直接回傳該工作表的部分彙總
+    return partials[base_dir] if base_dir in partials else combine_partials(list(partials.values()))
+
+
+def generate_combined_reports(partials_list, output_dir, regions=None, max_workers=None, use_cache=True,
+                              progress=None, cancel=None, pdf_images=None):
+    """
+    由多個檔案的部分彙總表（generate_file_reports 的回傳值，或已存的
+    {檔名}_aggregates.csv 路徑）產生跨檔案的全球與區域平均報告，輸出至 output_dir，
+    不需重新讀取原始資料。合併後的彙總表存為 {資料夾名稱}_aggregates.csv。
+    相同國家與年份出現在多個檔案時，資料列合併計算平均。回傳合併後的部分彙總表。
+    """
+    pdf_images = image_options(pdf_images)
+    if isinstance(regions, str):
+        regions = load_region_map(regions)
+    started = pdf_image_timestamp()
+    with trace_run("generate_combined_reports", output_dir):
+        with stage("compute"):
+            partials = combine_partials(partials_list)
+            if partials.empty:
+                raise ValueError("沒有可合併的彙總資料！")
+            os.makedirs(output_dir, exist_ok=True)
+            saved = save_partials(partials, aggregates_path(output_dir, os.path.basename(os.path.abspath(output_dir))))
+            jobs = _summary_jobs(partials, output_dir, regions)
+        # 跨檔案彙總以彙總檔名稱記錄所用的 PDF 圖片，與資料夾中的活頁簿區分
+        _run_report_jobs(jobs, [output_dir], len(jobs), os.path.basename(saved), max_workers=max_workers,
+                         use_cache=use_cache, progress=progress, cancel=cancel, pdf_images=pdf_images,
+                         started=started)
+    return partials
+
+
+def generate_reports(file_paths, max_workers=None, use_cache=True, pdf_images=None):
+    """
+    主流程：支援多檔案分析；max_workers 為同時繪圖的行程數（1 表示不平行）。
+    use_cache 為 True 時，資料未變動的圖表沿用 charts/ 中的舊圖，不重新繪製。
+    """
+    import tkinter as tk
+    from tkinter import messagebox
+
     if isinstance(file_paths, str):
         file_paths = [file_paths]
 
@@ -94,39 +451,25 @@ def generate_reports(file_paths):
     root.withdraw()
 
     for file_path in file_paths:
-        if not os.path.isfile(file_path):
-            messagebox.showerror("錯誤", f"找不到檔案：{file_path}")
-            continue
-
-        base_dir = os.path.dirname(file_path)
-        file_name = os.path.basename(file_path)
-
-        if not file_path.lower().endswith(('.xlsx', '.xls')):
-            messagebox.showerror("格式錯誤", f"{file_name} 不是 Excel 檔案！")
-            continue
-
         try:
-            df = pd.read_excel(file_path)
+            generate_file_reports(file_path, max_workers=max_workers, use_cache=use_cache,
+                                  pdf_images=pdf_images)
+        except FileNotFoundError as e:
+            messagebox.showerror("錯誤", str(e))
+        except ValueError as e:
+            messagebox.showerror("格式錯誤", str(e))
+        except RuntimeError as e:
+            messagebox.showerror("報告生成錯誤", f"{file_path}\n{e}")
         except Exception as e:
             messagebox.showerror("讀取錯誤", f"無法讀取檔案：{file_path}\n{e}")
-            continue
-
-        if '國家' not in df.columns:
-            messagebox.showerror("格式錯誤", f"檔案 {file_name} 缺少『國家』欄位！")
-            continue
-
-        countries = df['國家'].dropna().unique()
-        for country in countries:
-            generate_report(df[df['國家'] == country], name=country, base_dir=base_dir)
-
-        # === 全球平均 ===
-        world_data = df.groupby('年份').mean(numeric_only=True).reset_index()
-        generate_report(world_data, name="World", base_dir=base_dir, is_global=True)
 
     messagebox.showinfo("完成", "🎉 所有報告已生成，可於各檔案所在資料夾內查看。")
 
 
 if __name__ == "__main__":
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
     root = tk.Tk()
     root.withdraw()
     file_paths = filedialog.askopenfilenames(
@@ -1,45 +1,123 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox, simpledialog
 import pandas as pd
+import numpy as np
 import os
 import re
+from .loader import read_workbook
+from .instrument import traced, stage
+from .writer import write_table
 
-def merge_columns_by_prefix(df, new_col_prefix=None):
+# 前綴為字母，後面跟數字，例: e1, e2
+PREFIX_PATTERN = re.compile(r"([a-zA-Z]+)\d+$")
+
+# 可用的彙總方式：加總、平均、有效值個數
+AGGREGATES = ("sum", "mean", "count")
+
+def group_columns_by_prefix(df):
+    """單次掃描欄位名稱，回傳 {前綴: [欄位]}（依欄位出現順序）"""
+    prefixes = {}
+    for col in df.columns:
+        m = PREFIX_PATTERN.match(col) if isinstance(col, str) else None
+        if m:
+            prefixes.setdefault(m.group(1), []).append(col)
+    return prefixes
+
+def aggregate_by_prefix(df, prefixes, agg="sum", new_col_prefix=None):
+    """
+    將各前綴欄位排成連續陣列，以一次 np.add.reduceat 算出所有前綴的彙總，
+    回傳只含新欄位的 DataFrame。缺失值不計入（sum 視為 0；全缺失時 mean 為 NaN）。
+    """
+    if agg not in AGGREGATES:
+        raise ValueError(f"不支援的彙總方式：{agg}（可用：{', '.join(AGGREGATES)}）")
+
+    ordered = [col for cols in prefixes.values() for col in cols]
+    starts = np.cumsum([0] + [len(cols) for cols in prefixes.values()])[:-1]
+    subset = df[ordered]
+    try:
+        values = subset.to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        values = subset.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    # 轉置為 (欄位, 列) 的連續陣列，使每組欄位在記憶體中相鄰
+    values = np.ascontiguousarray(values.T)
+    valid = ~np.isnan(values)
+
+    counts = np.add.reduceat(valid, starts, axis=0, dtype=np.int64)
+    if agg == "count":
+        results = counts
+    else:
+        results = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+        if agg == "mean":
+            with np.errstate(divide='ignore', invalid='ignore'):
+                results = results / counts
+
+    kinds = dict(zip(ordered, (dtype.kind for dtype in subset.dtypes)))
+    columns = {}
+    for j, (prefix, cols) in enumerate(prefixes.items()):
+        col_name = f"{new_col_prefix}_{prefix}" if new_col_prefix else prefix
+        column = results[j]
+        # 整數欄位加總維持整數型別（與 DataFrame.sum 相同）
+        if agg == "sum" and all(kinds[c] in "iub" for c in cols):
+            column = column.astype(np.int64)
+        columns[col_name] = column
+    return pd.DataFrame(columns, index=df.index)
+
+def merge_columns_by_prefix(df, new_col_prefix=None, agg="sum"):
     """
-    自動抓取所有欄位，依前綴自動分組加總生成新欄位。
+    自動抓取所有欄位，依前綴自動分組彙總生成新欄位（預設加總）。
     嚴格區分大小寫，欄位名稱格式例: e1, e2, f1, f2
     new_col_prefix: 若 None，使用原前綴；若有輸入，使用該前綴加後綴區分
+    agg: "sum"、"mean" 或 "count"（有效值個數）
+    新欄位一次串接，避免逐欄插入造成 DataFrame 區塊碎片化。
     """
-    pattern = re.compile(r"([a-zA-Z]+)\d+$")  # 前綴為字母，後面跟數字
-    matched_cols = [col for col in df.columns if pattern.match(col)]
-    
-    if not matched_cols:
+    prefixes = group_columns_by_prefix(df)
+    if not prefixes:
+        from tkinter import messagebox
         messagebox.showwarning("警告", "未找到符合格式的欄位 (例: e1, e2)。")
         return df
 
-    prefixes = {}
-    for col in matched_cols:
-        prefix = pattern.match(col).group(1)
-        prefixes.setdefault(prefix, []).append(col)
+    new_cols = aggregate_by_prefix(df, prefixes, agg=agg, new_col_prefix=new_col_prefix)
+    # 同名舊欄位由新結果取代
+    existing = [col for col in new_cols.columns if col in df.columns]
+    return pd.concat([df.drop(columns=existing), new_cols], axis=1)
+
+@traced("merge_file")
+def merge_file(file_path, new_col_prefix=None, df=None, agg="sum", side_outputs=None):
+    """
+    合併單一檔案的同前綴欄位並輸出至 {檔名}_merged 資料夾，回傳輸出路徑。
+    找不到符合格式的欄位時拋出 ValueError（不顯示對話框）。
+    side_outputs 為另存副本的格式，例如 ["csv", "parquet"]。
+    """
+    if df is None:
+        with stage("read") as s:
+            df = read_workbook(file_path)
+            s.record(df)
+    with stage("clean"):
+        if not group_columns_by_prefix(df):
+            raise ValueError("未找到符合格式的欄位 (例: e1, e2)。")
 
-    for prefix, cols_to_merge in prefixes.items():
-        col_name = new_col_prefix if new_col_prefix else prefix
-        if new_col_prefix:
-            col_name = f"{new_col_prefix}_{prefix}"
-        df[col_name] = df[cols_to_merge].sum(axis=1)
+    with stage("compute") as s:
+        df = merge_columns_by_prefix(df, new_col_prefix, agg=agg)
+        s.record(df)
 
-    return df
+    folder = os.path.dirname(file_path)
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    output_dir = os.path.join(folder, f"{base_name}_merged")
+    os.makedirs(output_dir, exist_ok=True)
+    save_path = os.path.join(output_dir, f"{base_name}_merged.xlsx")
+    with stage("write"):
+        write_table(df, save_path, side_outputs=side_outputs)
+    return save_path
 
 def run_merge_process():
     """
     GUI：選擇檔案並自動合併同前綴欄位
     """
+    from tkinter import filedialog, messagebox, simpledialog
     file_path = filedialog.askopenfilename(title="選擇 Excel 檔案", filetypes=[("Excel Files", "*.xlsx *.xls")])
     if not file_path:
         return
 
     try:
-        df = pd.read_excel(file_path)
+        df = read_workbook(file_path)
     except Exception as e:
         messagebox.showerror("讀取錯誤", f"無法讀取檔案：{e}")
         return
@@ -50,13 +128,10 @@ def run_merge_process():
     if use_custom_prefix:
         new_col_prefix = simpledialog.askstring("新欄位名稱前綴", "請輸入合併後新欄位名稱前綴:")
 
-    df = merge_columns_by_prefix(df, new_col_prefix)
-
-    folder = os.path.dirname(file_path)
-    base_name = os.path.splitext(os.path.basename(file_path))[0]
-    output_dir = os.path.join(folder, f"{base_name}_merged")
-    os.makedirs(output_dir, exist_ok=True)
-    save_path = os.path.join(output_dir, f"{base_name}_merged.xlsx")
-    df.to_excel(save_path, index=False)
+    try:
+        save_path = merge_file(file_path, new_col_prefix, df=df)
+    except ValueError as e:
+        messagebox.showwarning("警告", str(e))
+        return
 
     messagebox.showinfo("完成", f"欄位自動合併完成！結果儲存至：\n{save_path}")
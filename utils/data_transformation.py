@@ -1,22 +1,267 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import pandas as pd
+import numpy as np
 import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .loader import read_workbook
+from .instrument import traced, stage
+from .writer import write_table
+
+# Optional dependencies
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# 整數代碼範圍在此以內（例如 Likert 量表）時使用查表法
+LOOKUP_MAX_RANGE = 1024
+
+def _lookup_transform(values, mapping):
+    """
+    以 NumPy 查表轉換整數代碼矩陣（可含 NaN）；不適用時回傳 None。
+    回傳 (轉換結果, 各欄是否有值被轉換)；結果型別與 Series.map 相同：
+    原型別與轉換值型別的共同型別。沒有任何值被轉換時直接回傳原陣列。
+    """
+    new_values = np.asarray(list(mapping.values()))
+    if values.dtype.kind not in "iuf" or new_values.dtype.kind not in "iuf":
+        return None
+    valid = ~np.isnan(values) if values.dtype.kind == "f" else np.ones(values.shape, dtype=bool)
+    codes = values[valid]
+    if codes.size == 0 or not np.array_equal(codes, np.round(codes)):
+        return None
+    lo, hi = int(codes.min()), int(codes.max())
+    if hi - lo > LOOKUP_MAX_RANGE:
+        return None
+
+    out_dtype = np.result_type(values.dtype, new_values.dtype)
+    lut = np.arange(lo, hi + 1).astype(out_dtype)
+    hit = np.zeros(hi - lo + 1, dtype=bool)
+    for old, new in mapping.items():
+        if isinstance(old, (int, float, np.number)) and old == old and float(old).is_integer() and lo <= old <= hi:
+            lut[int(old) - lo] = new
+            hit[int(old) - lo] = True
+    index = np.where(valid, values, lo).astype(np.intp) - lo
+    mapped = hit[index] & valid
+    changed = mapped.any(axis=0)
+    if not changed.any():
+        return values, changed
+    out = values.astype(out_dtype)
+    out[mapped] = lut[index[mapped]]
+    return out, changed
+
+def _map_values(series, mapping):
+    """一般欄位：以雜湊查詢一次轉換整欄，不在 mapping 中的值保持原值"""
+    matched = series.isin(list(mapping))
+    if not matched.any():
+        return series
+    return series.map(mapping).where(matched, series).infer_objects()
 
 def transform_columns(df, columns, mapping):
-    df_copy = df.copy()
-    for col in columns:
-        if col in df_copy.columns:
-            df_copy[col] = df_copy[col].map(lambda x: mapping.get(x, x))
+    """
+    依 mapping 轉換指定欄位的值（不在 mapping 中的值保持不變）。
+    同型別的整數代碼欄位一次查表轉換，其餘欄位以雜湊查詢逐欄轉換；
+    只產生被轉換的欄位，其他欄位與原資料共用，不複製整張表。
+    """
+    cols = [col for col in dict.fromkeys(columns) if col in df.columns]
+    df_copy = df.copy(deep=False)
+    if not cols or not mapping:
+        return df_copy
+
+    dtypes = df[cols].dtypes
+    for _, group in dtypes.groupby(dtypes.astype(str), sort=False):
+        group_cols = list(group.index)
+        numeric = group.iloc[0].kind in "iuf"
+        transformed = _lookup_transform(df[group_cols].to_numpy(), mapping) if numeric else None
+        if transformed is not None:
+            # 沒有值被轉換的欄位保留原欄位（不升級型別）
+            values, changed = transformed
+            for j, col in enumerate(group_cols):
+                if changed[j]:
+                    df_copy[col] = values[:, j]
+            continue
+        for col in group_cols:
+            transformed = _lookup_transform(df[col].to_numpy(), mapping) if numeric else None
+            if transformed is None:
+                df_copy[col] = _map_values(df[col], mapping)
+            elif transformed[1]:
+                df_copy[col] = transformed[0]
     return df_copy
 
+def _output_path(file_path):
+    folder = os.path.dirname(file_path)
+    base = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(folder, f"{base}_transformed.xlsx")
+
+@traced("transform_file")
+def transform_file(file_path, columns, mapping, df=None, side_outputs=None):
+    """
+    轉換單一檔案的指定欄位並輸出 *_transformed.xlsx，回傳輸出路徑。
+    side_outputs 為另存副本的格式，例如 ["csv", "parquet"]
+    """
+    if df is None:
+        with stage("read") as s:
+            df = read_workbook(file_path)
+            s.record(df)
+    with stage("compute") as s:
+        df_transformed = transform_columns(df, columns, mapping)
+        s.record(df_transformed)
+    output_path = _output_path(file_path)
+    with stage("write"):
+        write_table(df_transformed, output_path, side_outputs=side_outputs)
+    return output_path
+
+# ------------------------------
+# 規則檔：可重複使用的轉換規則組
+# ------------------------------
+# JSON / YAML 格式：
+#   {"rules": [{"columns": ["R1", "R2"], "mapping": {"1": 5, "2": 4, "4": 2, "5": 1}}, ...]}
+# 每組規則依序套用；mapping 的鍵可寫成字串，數字會自動轉為數值。
+
+def _parse_key(key):
+    if isinstance(key, str):
+        try:
+            return float(key)
+        except ValueError:
+            return key
+    return key
+
+def load_rules(path):
+    """讀取規則檔，回傳 [(欄位 list, mapping dict), ...]"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML not installed!")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    rule_sets = []
+    for i, rule in enumerate(rules):
+        if not rule.get("columns") or not rule.get("mapping"):
+            raise ValueError(f"第 {i + 1} 組規則缺少 columns 或 mapping")
+        mapping = {_parse_key(k): v for k, v in rule["mapping"].items()}
+        rule_sets.append((list(rule["columns"]), mapping))
+    return rule_sets
+
+def save_rules(path, rule_sets):
+    """將 [(欄位 list, mapping dict), ...] 存成規則檔（依副檔名為 JSON 或 YAML）"""
+    data = {"rules": [
+        {"columns": list(columns), "mapping": {str(k): v for k, v in mapping.items()}}
+        for columns, mapping in rule_sets
+    ]}
+    with open(path, "w", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML not installed!")
+            yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+def apply_rules(df, rule_sets):
+    """依序套用每組規則"""
+    for columns, mapping in rule_sets:
+        df = transform_columns(df, columns, mapping)
+    return df
+
+@traced("transform_file_with_rules")
+def transform_file_with_rules(file_path, rule_sets, side_outputs=None):
+    """以規則組轉換單一檔案並輸出 *_transformed.xlsx，回傳輸出路徑"""
+    with stage("read") as s:
+        df = read_workbook(file_path)
+        s.record(df)
+    with stage("compute") as s:
+        df_transformed = apply_rules(df, rule_sets)
+        s.record(df_transformed)
+    output_path = _output_path(file_path)
+    with stage("write"):
+        write_table(df_transformed, output_path, side_outputs=side_outputs)
+    return output_path
+
+def batch_transform(file_paths, rule_sets, max_workers=None, side_outputs=None, progress=None, cancel=None):
+    """
+    以同一規則組平行轉換多個檔案。
+    回傳 {檔案路徑: 輸出路徑或 Exception}，單一檔案失敗不影響其他檔案。
+    progress(已完成數, 檔案總數, 檔案路徑) 於每個檔案完成後呼叫；
+    cancel（threading.Event）被設定後尚未開始的檔案不再轉換，也不列入回傳結果。
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    results = {}
+
+    def report(path):
+        if progress is not None:
+            progress(len(results), len(file_paths), path)
+
+    if max_workers == 1 or len(file_paths) == 1:
+        for path in file_paths:
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                results[path] = transform_file_with_rules(path, rule_sets, side_outputs)
+            except Exception as e:
+                results[path] = e
+            report(path)
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(transform_file_with_rules, path, rule_sets, side_outputs): path
+                   for path in file_paths}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+            report(futures[future])
+            if cancel is not None and cancel.is_set():
+                for pending in futures:
+                    pending.cancel()
+    return {path: results[path] for path in file_paths if path in results}
+
+def select_batch_transform_inputs():
+    """GUI：選擇規則檔與多個 Excel 檔，回傳 (規則組, 檔案清單)；取消或規則檔錯誤時回傳 None"""
+    from tkinter import filedialog, messagebox
+    rules_path = filedialog.askopenfilename(title="選擇規則檔", filetypes=[("Rule Files", "*.json *.yaml *.yml")])
+    if not rules_path:
+        return None
+    try:
+        rule_sets = load_rules(rules_path)
+    except Exception as e:
+        messagebox.showerror("讀取錯誤", f"無法讀取規則檔：{e}")
+        return None
+    file_paths = filedialog.askopenfilenames(title="選擇一個或多個 Excel 檔案", filetypes=[("Excel Files", "*.xlsx *.xls")])
+    if not file_paths:
+        return None
+    return rule_sets, list(file_paths)
+
+def show_batch_transform_summary(results):
+    """GUI：顯示 batch_transform 的結果摘要"""
+    from tkinter import messagebox
+    failed = [f"{os.path.basename(p)}：{r}" for p, r in results.items() if isinstance(r, Exception)]
+    done = len(results) - len(failed)
+    message = f"已完成 {done} 個檔案的轉換。"
+    if failed:
+        messagebox.showwarning("部分失敗", message + "\n以下檔案失敗：\n" + "\n".join(failed))
+    else:
+        messagebox.showinfo("完成", message)
+
+def run_batch_transform_process():
+    """GUI：選擇規則檔與多個 Excel 檔，批次套用轉換規則（主視窗以 JobRunner 在背景執行）"""
+    selected = select_batch_transform_inputs()
+    if selected is None:
+        return
+    rule_sets, file_paths = selected
+    show_batch_transform_summary(batch_transform(file_paths, rule_sets))
+
 def run_transform_process():
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     # 選檔案
     file_path = filedialog.askopenfilename(title="選擇 Excel 檔案", filetypes=[("Excel Files","*.xlsx *.xls")])
     if not file_path:
         return
     try:
-        df = pd.read_excel(file_path)
+        df = read_workbook(file_path)
     except Exception as e:
         messagebox.showerror("讀取錯誤", f"無法讀取檔案：{e}")
         return
@@ -44,7 +289,7 @@ def run_transform_process():
     def step2_rules_input(selected_columns):
         rules_win = tk.Toplevel()
         rules_win.title("步驟2：輸入轉換規則")
-        rules_win.geometry("500x400")
+        rules_win.geometry("500x450")
 
         tk.Label(rules_win, text=f"已選欄位: {', '.join(selected_columns)}").pack(pady=5)
 
@@ -54,6 +299,7 @@ def run_transform_process():
         tk.Label(frame_rules, text="初始值").grid(row=0, column=0, padx=5)
         tk.Label(frame_rules, text="變換值").grid(row=0, column=1, padx=5)
 
+        mapping = {}
         rules_listbox = tk.Listbox(rules_win, height=10, width=50)
         rules_listbox.pack(pady=5)
 
@@ -76,23 +322,32 @@ def run_transform_process():
             except:
                 messagebox.showerror("錯誤", "請輸入數字")
                 return
+            mapping[old_val_f] = new_val_f
             rules_listbox.insert(tk.END, f"{old_val_f} -> {new_val_f}")
             entry_old.delete(0, tk.END)
             entry_new.delete(0, tk.END)
 
+        def save_rules_file():
+            if not mapping:
+                messagebox.showerror("錯誤", "尚未新增任何規則")
+                return
+            path = filedialog.asksaveasfilename(title="儲存規則檔", defaultextension=".json",
+                                                filetypes=[("JSON", "*.json"), ("YAML", "*.yaml *.yml")])
+            if not path:
+                return
+            try:
+                save_rules(path, [(selected_columns, mapping)])
+            except Exception as e:
+                messagebox.showerror("錯誤", f"無法儲存規則檔：{e}")
+                return
+            messagebox.showinfo("完成", f"規則已儲存至：{path}")
+
         def execute_transform():
-            mapping = {}
-            for item in rules_listbox.get(0, tk.END):
-                old, new = item.split("->")
-                mapping[float(old.strip())] = float(new.strip())
-            df_transformed = transform_columns(df, selected_columns, mapping)
-            folder = os.path.dirname(file_path)
-            base = os.path.splitext(os.path.basename(file_path))[0]
-            output_path = os.path.join(folder, f"{base}_transformed.xlsx")
-            df_transformed.to_excel(output_path, index=False)
+            output_path = transform_file(file_path, selected_columns, mapping, df=df)
             messagebox.showinfo("完成", f"轉換完成，檔案已儲存至：{output_path}")
             rules_win.destroy()
 
         tk.Button(rules_win, text="新增規則", width=20, command=add_rule).pack(pady=5)
+        tk.Button(rules_win, text="儲存規則檔", width=20, command=save_rules_file).pack(pady=5)
         tk.Button(rules_win, text="執行轉換", width=20, command=execute_transform).pack(pady=5)
         tk.Button(rules_win, text="取消", width=20, command=rules_win.destroy).pack(pady=5)
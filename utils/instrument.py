@@ -0,0 +1,261 @@
+"""
+選用的效能追蹤：記錄各分析進入點每個階段（read / clean / compute / render / write）
+的耗時與資料列數、欄數，可匯出為 JSON 或 CSV，並可選擇以 cProfile 剖析。
+
+預設關閉，關閉時 trace_run / stage 只回傳不做事的物件，幾乎沒有額外成本。
+enable_tracing(spool_dir=...) 會設定環境變數 ELEARNING_TRACE_DIR，
+之後啟動的子行程也會自動開啟追蹤，並將紀錄寫入同一資料夾
+（每個行程一個 trace-<pid>.jsonl），由 export_trace 合併匯出。
+
+用法：
+    from utils import instrument
+    instrument.enable_tracing(profile_dir="profiles")
+    ...  # 執行分析
+    instrument.export_trace("trace.json")   # 或 trace.csv
+"""
+import os
+import csv
+import json
+import time
+import threading
+import functools
+
+TRACE_DIR_ENV = "ELEARNING_TRACE_DIR"
+PROFILE_DIR_ENV = "ELEARNING_PROFILE_DIR"
+STAGES = ("read", "clean", "compute", "render", "write")
+CSV_FIELDS = ["entry", "file", "pid", "start", "seconds", "status", "rows", "columns",
+              "stage", "stage_seconds", "stage_rows", "stage_columns", "profile"]
+
+_enabled = False
+_spool_dir = None
+_profile_dir = None
+_records = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable_tracing(spool_dir=None, profile_dir=None):
+    """
+    開啟追蹤。spool_dir 指定時紀錄寫入該資料夾（可跨行程收集），否則保留在記憶體；
+    profile_dir 指定時，每次最外層的分析呼叫都會以 cProfile 剖析並存成 .prof 檔。
+    """
+    global _enabled, _spool_dir, _profile_dir
+    for path in (spool_dir, profile_dir):
+        if path:
+            os.makedirs(path, exist_ok=True)
+    _enabled, _spool_dir, _profile_dir = True, spool_dir, profile_dir
+    for env, value in ((TRACE_DIR_ENV, spool_dir), (PROFILE_DIR_ENV, profile_dir)):
+        if value:
+            os.environ[env] = os.path.abspath(value)
+        else:
+            os.environ.pop(env, None)
+
+
+def disable_tracing():
+    global _enabled, _spool_dir, _profile_dir
+    _enabled, _spool_dir, _profile_dir = False, None, None
+    os.environ.pop(TRACE_DIR_ENV, None)
+    os.environ.pop(PROFILE_DIR_ENV, None)
+
+
+def is_tracing():
+    return _enabled
+
+
+def reset_trace():
+    """清除記憶體中的紀錄（spool 資料夾中的檔案不受影響）"""
+    with _lock:
+        _records.clear()
+
+
+def _shape(df):
+    shape = getattr(df, "shape", None)
+    if not shape:
+        return None, None
+    return shape[0], (shape[1] if len(shape) > 1 else 1)
+
+
+class _NullSpan:
+    """追蹤關閉時使用：所有操作皆不做事"""
+
+    def record(self, df=None, rows=None, columns=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Stage(_NullSpan):
+    def __init__(self, run, name):
+        self.run = run
+        self.entry = {"stage": name, "seconds": None, "rows": None, "columns": None}
+
+    def record(self, df=None, rows=None, columns=None):
+        """記錄此階段產出的資料大小（傳入 DataFrame 或直接指定列數、欄數）"""
+        if df is not None:
+            rows, columns = _shape(df)
+        self.entry["rows"], self.entry["columns"] = rows, columns
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.entry["seconds"] = time.perf_counter() - self._start
+        self.run.record_data["stages"].append(self.entry)
+        return False
+
+
+class _Run(_NullSpan):
+    def __init__(self, entry, file=None):
+        self.record_data = {
+            "entry": entry, "file": None if file is None else str(file), "pid": os.getpid(),
+            "start": None, "seconds": None, "status": "ok", "rows": None, "columns": None,
+            "stages": [], "profile": None,
+        }
+        self._profiler = None
+
+    def record(self, df=None, rows=None, columns=None):
+        """記錄此次分析的輸入資料大小"""
+        if df is not None:
+            rows, columns = _shape(df)
+        self.record_data["rows"], self.record_data["columns"] = rows, columns
+
+    def __enter__(self):
+        stack = _stack()
+        # cProfile 同時只能有一個作用中的剖析器，只剖析最外層的呼叫
+        if _profile_dir and not stack:
+            import cProfile
+            self._profiler = cProfile.Profile()
+        stack.append(self)
+        self.record_data["start"] = time.time()
+        self._start = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.record_data["seconds"] = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.record_data["status"] = f"error: {exc_type.__name__}"
+        _stack().pop()
+        if self._profiler is not None:
+            self.record_data["profile"] = self._dump_profile()
+        _store(self.record_data)
+        return False
+
+    def _dump_profile(self):
+        data = self.record_data
+        name = f"{data['entry']}-{data['pid']}-{int(data['start'] * 1000)}-{id(self):x}.prof"
+        path = os.path.join(_profile_dir, name)
+        try:
+            self._profiler.dump_stats(path)
+        except OSError:
+            return None
+        return path
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _store(record):
+    with _lock:
+        if _spool_dir:
+            path = os.path.join(_spool_dir, f"trace-{os.getpid()}.jsonl")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            _records.append(record)
+
+
+def trace_run(entry, file=None):
+    """
+    以 with 包住一次分析（例：單一檔案）：
+        with trace_run("merge_file", file_path) as run:
+            with stage("read") as s:
+                df = read_workbook(file_path)
+                s.record(df)
+    """
+    return _Run(entry, file) if _enabled else _NULL
+
+
+def stage(name):
+    """記錄目前分析中的一個階段；不在 trace_run 之內或追蹤關閉時不做事"""
+    if not _enabled:
+        return _NULL
+    stack = _stack()
+    return _Stage(stack[-1], name) if stack else _NULL
+
+
+def record(df=None, rows=None, columns=None):
+    """記錄目前分析（trace_run 或 traced）的輸入資料大小；不在分析之內或追蹤關閉時不做事"""
+    if not _enabled:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1].record(df, rows=rows, columns=columns)
+
+
+def traced(entry, file_arg=0):
+    """
+    函式裝飾器：每次呼叫記錄為一次分析。第 file_arg 個位置參數為字串時記為檔案路徑。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            file = args[file_arg] if len(args) > file_arg and isinstance(args[file_arg], str) else None
+            with trace_run(entry, file):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_trace():
+    """回傳所有紀錄（記憶體與 spool 資料夾），依開始時間排序"""
+    with _lock:
+        records = list(_records)
+    spool_dir = _spool_dir or os.environ.get(TRACE_DIR_ENV)
+    if spool_dir and os.path.isdir(spool_dir):
+        for name in sorted(os.listdir(spool_dir)):
+            if not (name.startswith("trace-") and name.endswith(".jsonl")):
+                continue
+            with open(os.path.join(spool_dir, name), "r", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+    return sorted(records, key=lambda r: r["start"] or 0)
+
+
+def export_trace(path, records=None):
+    """匯出紀錄：副檔名 .csv 時每個階段一列，其餘寫成 JSON"""
+    records = get_trace() if records is None else records
+    if str(path).lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for record in records:
+                base = {k: v for k, v in record.items() if k != "stages"}
+                for s in record["stages"] or [{}]:
+                    writer.writerow({**base, "stage": s.get("stage"), "stage_seconds": s.get("seconds"),
+                                     "stage_rows": s.get("rows"), "stage_columns": s.get("columns")})
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"records": records}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+# 由設定了 ELEARNING_TRACE_DIR 的父行程啟動時自動開啟追蹤
+if os.environ.get(TRACE_DIR_ENV):
+    enable_tracing(os.environ[TRACE_DIR_ENV], os.environ.get(PROFILE_DIR_ENV))
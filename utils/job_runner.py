@@ -0,0 +1,230 @@
+"""
+背景工作執行器：讓分析在工作執行緒中執行，tkinter 主視窗保持可操作。
+
+- 工作函式在執行緒池中執行（可同時執行多個工作），第一個參數為 Job，
+  可呼叫 job.report(done, total, message) 回報進度，並以 job.cancelled 檢查是否被取消。
+- 進度與結果放入 queue，由主執行緒以 root.after 定期取出，
+  回呼函式（on_done / on_error 與監聽者）一律在主執行緒執行，可安全操作視窗。
+- 取消為協同式：尚未開始的工作直接取消；執行中的工作在下一個檢查點停止。
+- 耗時的繪圖與批次分析本身已使用多行程平行處理，執行緒只負責協調與等待。
+"""
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+from tkinter import ttk
+
+MAX_CONCURRENT_JOBS = 3
+POLL_MS = 100
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "等待中", "執行中", "完成", "失敗", "已取消"
+
+
+class JobCancelled(Exception):
+    """工作函式可拋出此例外以表示已回應取消要求"""
+
+
+class Job:
+    def __init__(self, job_id, name, queue_):
+        self.id = job_id
+        self.name = name
+        self.status = PENDING
+        self.done = 0
+        self.total = None
+        self.message = ""
+        self.result = None
+        self.error = None
+        self._queue = queue_
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    # ---- 以下由工作執行緒呼叫 ----
+    def report(self, done, total=None, message=""):
+        """回報進度（執行緒安全）"""
+        self._queue.put((self.id, "progress", (done, total, message)))
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def cancel_event(self):
+        """threading.Event，可直接傳給支援 cancel 參數的分析函式"""
+        return self._cancel_event
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    # ---- 以下由主執行緒呼叫 ----
+    def cancel(self):
+        self._cancel_event.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+class JobRunner:
+    """
+    在 root 的事件迴圈中輪詢工作狀態。
+        runner = JobRunner(root)
+        runner.submit("信度分析", func, path, on_done=show_result)
+    """
+
+    def __init__(self, root, max_jobs=MAX_CONCURRENT_JOBS, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self._callbacks = {}
+        self._listeners = []
+        self._next_id = 1
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, name, func, *args, on_done=None, on_error=None, **kwargs):
+        """排入工作 func(job, *args, **kwargs)；on_done(result) / on_error(exc) 在主執行緒呼叫"""
+        job = Job(self._next_id, name, self._queue)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        self._callbacks[job.id] = (on_done, on_error)
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        self._notify(job)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            self._queue.put((job.id, "cancelled", None))
+            return
+        self._queue.put((job.id, "running", None))
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            self._queue.put((job.id, "cancelled", None))
+        except Exception as e:
+            e.traceback_text = traceback.format_exc()
+            self._queue.put((job.id, "error", e))
+        else:
+            self._queue.put((job.id, "cancelled" if job.cancelled else "done", result))
+
+    def _poll(self):
+        while True:
+            try:
+                job_id, kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._handle(self.jobs.get(job_id), kind, payload)
+        if not self._closed:
+            self.root.after(self.poll_ms, self._poll)
+
+    def _handle(self, job, kind, payload):
+        if job is None:
+            return
+        if kind == "progress":
+            job.done, total, job.message = payload
+            job.total = total if total is not None else job.total
+        elif kind == "running":
+            job.status = RUNNING
+        elif kind == "cancelled":
+            job.status = CANCELLED
+        elif kind == "done":
+            job.status, job.result = DONE, payload
+        elif kind == "error":
+            job.status, job.error = FAILED, payload
+        self._notify(job)
+
+        if job.finished:
+            on_done, on_error = self._callbacks.pop(job.id, (None, None))
+            if job.status == DONE and on_done:
+                on_done(job.result)
+            elif job.status == FAILED and on_error:
+                on_error(job.error)
+
+    def _notify(self, job):
+        for listener in self._listeners:
+            listener(job)
+
+    def add_listener(self, listener):
+        """listener(job) 於每次狀態或進度變更時在主執行緒呼叫"""
+        self._listeners.append(listener)
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel()
+            # 尚未開始的工作不會再執行，直接標記為已取消
+            if job._future.cancelled():
+                self._queue.put((job.id, "cancelled", None))
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def active_jobs(self):
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def clear_finished(self):
+        for job_id in [j.id for j in self.jobs.values() if j.finished]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        """取消所有工作並停止輪詢（不等待執行中的工作結束）"""
+        self.cancel_all()
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class JobPanel(tk.Frame):
+    """顯示工作清單、進度與取消按鈕的面板"""
+
+    def __init__(self, master, runner, height=5, **kwargs):
+        super().__init__(master, **kwargs)
+        self.runner = runner
+        self.tree = ttk.Treeview(self, columns=("status", "progress"), height=height)
+        self.tree.heading("#0", text="工作")
+        self.tree.heading("status", text="狀態")
+        self.tree.heading("progress", text="進度")
+        self.tree.column("#0", width=200)
+        self.tree.column("status", width=60, anchor=tk.CENTER)
+        self.tree.column("progress", width=140)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        buttons = tk.Frame(self)
+        buttons.pack(fill=tk.X, pady=3)
+        tk.Button(buttons, text="取消選取的工作", command=self.cancel_selected).pack(side=tk.LEFT, expand=True)
+        tk.Button(buttons, text="清除已結束的工作", command=self.clear_finished).pack(side=tk.LEFT, expand=True)
+        runner.add_listener(self.update_job)
+
+    @staticmethod
+    def _progress_text(job):
+        if job.total:
+            text = f"{job.done}/{job.total}"
+        elif job.done:
+            text = str(job.done)
+        else:
+            text = ""
+        return f"{text} {job.message}".strip()
+
+    def update_job(self, job):
+        iid = str(job.id)
+        values = (job.status, self._progress_text(job))
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=values)
+        else:
+            self.tree.insert("", tk.END, iid=iid, text=job.name, values=values)
+
+    def cancel_selected(self):
+        for iid in self.tree.selection():
+            self.runner.cancel(int(iid))
+
+    def clear_finished(self):
+        for job in self.runner.jobs.values():
+            if job.finished and self.tree.exists(str(job.id)):
+                self.tree.delete(str(job.id))
+        self.runner.clear_finished()
@@ -0,0 +1,269 @@
+"""
+共用 Excel 讀取器：每個活頁簿只解析一次。
+
+解析結果以 (路徑, 檔案大小, 修改時間, 工作表) 為鍵，存為欄式快取
+（安裝 pyarrow 時為 Parquet，否則為 pickle），同一行程內另保留記憶體快取；
+之後的讀取直接由快取提供，檔案變動後自動重新解析。
+快取預設放在使用者自己的快取資料夾（Windows 為 %LOCALAPPDATA%\\elearning，
+其他系統為 ~/.cache/elearning），不放在可能與他人共用的資料夾：
+載入 pickle 可能執行任意程式碼，因此也只載入目前使用者擁有的 pickle 快取。
+可用環境變數 ELEARNING_CACHE_DIR 指定其他位置。
+
+read_workbook_numeric 則以 openpyxl 唯讀模式逐批讀取列，邊讀邊轉為數值，
+不建立整張表的 object 型別中間資料，適合超大型活頁簿。
+read_all_sheets / read_workbook_numeric(sheet_name=None) 只開啟活頁簿一次即讀取所有工作表。
+"""
+import os
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Optional dependencies
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+CACHE_DIR_ENV = "ELEARNING_CACHE_DIR"
+CACHE_DIR_NAME = "elearning"
+MEMORY_CACHE_SIZE = 4
+STREAM_CHUNK_ROWS = 5000
+
+_memory_cache = OrderedDict()
+
+
+def _file_key(file_path, sheet_name):
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    return abs_path, stat.st_size, stat.st_mtime_ns, sheet_name
+
+
+def _file_prefix(abs_path):
+    """同一檔案所有工作表共用的快取檔名前綴"""
+    ident = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+    base = os.path.splitext(os.path.basename(abs_path))[0]
+    return f"{base}-{ident}-"
+
+
+def _cache_stem(key):
+    """快取檔名前綴（同一檔案同一工作表固定）與完整檔名主體"""
+    abs_path, size, mtime_ns, sheet_name = key
+    sheet_ident = hashlib.sha1(repr(sheet_name).encode("utf-8")).hexdigest()[:8]
+    prefix = f"{_file_prefix(abs_path)}{sheet_ident}-"
+    return prefix, f"{prefix}{size}-{mtime_ns}"
+
+
+def _cache_dir(abs_path):
+    env_dir = os.environ.get(CACHE_DIR_ENV)
+    if env_dir:
+        return env_dir
+    if os.name == "nt":
+        root = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, CACHE_DIR_NAME)
+
+
+def _owned_by_user(path):
+    """pickle 只載入目前使用者擁有的檔案（Windows 以使用者資料夾的權限保護）"""
+    if not hasattr(os, "getuid"):
+        return True
+    return os.stat(path).st_uid == os.getuid()
+
+
+def _read_disk_cache(cache_dir, stem):
+    for ext, reader in ((".parquet", pd.read_parquet), (".pkl", pd.read_pickle)):
+        path = os.path.join(cache_dir, stem + ext)
+        if not os.path.isfile(path):
+            continue
+        if (ext == ".parquet" and pyarrow is not None) or (ext == ".pkl" and _owned_by_user(path)):
+            try:
+                return reader(path)
+            except Exception:
+                pass
+    return None
+
+
+def _write_disk_cache(cache_dir, prefix, stem, df):
+    """寫入快取並刪除同一檔案的舊版本；無法寫入時略過（僅影響速度）"""
+    try:
+        # 新建的快取資料夾只有目前使用者可讀寫
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix):
+                os.remove(os.path.join(cache_dir, name))
+        if pyarrow is not None:
+            try:
+                df.to_parquet(os.path.join(cache_dir, stem + ".parquet"))
+                return
+            except Exception:
+                # 欄位名稱非字串或混合型別欄位無法存成 Parquet，改用 pickle
+                pass
+        df.to_pickle(os.path.join(cache_dir, stem + ".pkl"))
+    except OSError:
+        pass
+
+
+def _remember(key, df):
+    _memory_cache[key] = df
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+def read_workbook(file_path, sheet_name=0, use_cache=True):
+    """
+    讀取 Excel 工作表為 DataFrame（等同 pd.read_excel(file_path, sheet_name=sheet_name)）。
+    回傳的是副本，呼叫端可自由修改。
+    """
+    if not use_cache:
+        return pd.read_excel(file_path, sheet_name=sheet_name)
+
+    key = _file_key(file_path, sheet_name)
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key].copy()
+
+    cache_dir = _cache_dir(key[0])
+    prefix, stem = _cache_stem(key)
+    df = _read_disk_cache(cache_dir, stem)
+    if df is None:
+        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        _write_disk_cache(cache_dir, prefix, stem, df)
+    _remember(key, df)
+    return df.copy()
+
+
+def read_all_sheets(file_path, use_cache=True):
+    """
+    一次開啟活頁簿並讀取所有工作表，回傳 {工作表名稱: DataFrame}（依活頁簿順序），
+    等同 pd.read_excel(file_path, sheet_name=None)。
+    各工作表與 read_workbook(file_path, sheet_name=名稱) 共用快取，
+    只有快取中沒有的工作表才會解析；回傳的是副本。
+    """
+    if not use_cache:
+        return pd.read_excel(file_path, sheet_name=None)
+
+    sheets = {}
+    with pd.ExcelFile(file_path) as xl:
+        for name in xl.sheet_names:
+            key = _file_key(file_path, name)
+            if key in _memory_cache:
+                _memory_cache.move_to_end(key)
+                sheets[name] = _memory_cache[key].copy()
+                continue
+            cache_dir = _cache_dir(key[0])
+            prefix, stem = _cache_stem(key)
+            df = _read_disk_cache(cache_dir, stem)
+            if df is None:
+                df = xl.parse(name)
+                _write_disk_cache(cache_dir, prefix, stem, df)
+            _remember(key, df)
+            sheets[name] = df.copy()
+    return sheets
+
+
+def clear_cache(file_path=None):
+    """清除記憶體快取；指定 file_path 時一併刪除該檔案的磁碟快取"""
+    _memory_cache.clear()
+    if file_path is None:
+        return
+    abs_path = os.path.abspath(file_path)
+    cache_dir = _cache_dir(abs_path)
+    if not os.path.isdir(cache_dir):
+        return
+    # 以含路徑雜湊的完整前綴比對，data.xlsx 不會刪到 data-2024.xlsx 的快取
+    prefix = _file_prefix(abs_path)
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def _header_names(header):
+    """比照 pd.read_excel 命名：空白標題為 Unnamed: i，重複名稱加上 .1、.2"""
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _downcast(values):
+    """整數值欄位轉為最小整數型別；可無損表示的小數轉為 float32"""
+    if not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+        return pd.to_numeric(values, downcast='integer')
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32, values, equal_nan=True):
+        return as_float32
+    return values
+
+
+def read_workbook_numeric(file_path, sheet_name=0, chunk_rows=STREAM_CHUNK_ROWS, drop_empty_rows=True):
+    """
+    低記憶體讀取：逐批讀取工作表並轉為數值（等同
+    read_workbook(...).apply(pd.to_numeric, errors='coerce').dropna(how='all')），
+    欄位最後縮減為最小的數值型別。.xls 不支援唯讀模式，改用一般讀取。
+    sheet_name=None 時只開啟活頁簿一次，回傳 {工作表名稱: DataFrame}。
+    """
+    if not str(file_path).lower().endswith((".xlsx", ".xlsm")):
+        def to_numeric(df):
+            df = df.apply(pd.to_numeric, errors='coerce')
+            return df.dropna(how='all') if drop_empty_rows else df
+        if sheet_name is None:
+            return {name: to_numeric(df) for name, df in read_all_sheets(file_path).items()}
+        return to_numeric(read_workbook(file_path, sheet_name=sheet_name))
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            return {ws.title: _read_sheet_numeric(ws, chunk_rows, drop_empty_rows) for ws in wb.worksheets}
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        return _read_sheet_numeric(ws, chunk_rows, drop_empty_rows)
+    finally:
+        wb.close()
+
+
+def _read_sheet_numeric(ws, chunk_rows, drop_empty_rows):
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    columns = _header_names(header)
+    k = len(columns)
+
+    # 最多先配置一批的大小，不足時加倍；ws.max_row 只是檔案記錄的範圍，
+    # 整欄套用格式的檔案會記錄為 1,048,576 列，只用於縮小較小工作表的初始配置
+    declared = (ws.max_row or 0) - 1
+    values = np.empty((min(declared, chunk_rows) if declared > 0 else chunk_rows, k))
+    count = 0
+
+    def flush(chunk):
+        nonlocal values, count
+        block = (pd.DataFrame.from_records(chunk, columns=range(k))
+                 .apply(pd.to_numeric, errors='coerce')
+                 .to_numpy(dtype=float))
+        if drop_empty_rows:
+            block = block[~np.isnan(block).all(axis=1)]
+        if count + len(block) > len(values):
+            values = np.resize(values, (max(2 * len(values), count + len(block)), k))
+        values[count:count + len(block)] = block
+        count += len(block)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row[:k] if len(row) >= k else row + (None,) * (k - len(row)))
+        if len(chunk) >= chunk_rows:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    values = values[:count]
+    return pd.DataFrame({name: _downcast(values[:, j]) for j, name in enumerate(columns)})
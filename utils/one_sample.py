@@ -1,17 +1,20 @@
-import pandas as pd
-import numpy as np
-from scipy import stats
-from statsmodels.stats.power import TTestPower
 import os
+from .ttest_engine import one_sample_table
+from .instrument import traced, stage, record
+from .writer import write_table
+from .sheets import analyze_sheets, combine_tables, write_sheet_tables
 
-def one_sample_analysis(file_path, data, value_cols, popmeans=None):
+@traced("one_sample_analysis")
+def one_sample_analysis(file_path, data, value_cols, popmeans=None, side_outputs=None):
     """
     單一樣本 t 檢定 (支援多欄位)
     Parameters:
         file_path (str): 原始檔案路徑
-        data (pd.DataFrame): 待分析資料
+        data (pd.DataFrame | dict): 待分析資料；傳入 {工作表名稱: DataFrame} 時逐一分析各工作表
+            (同時執行)與全部工作表合併的資料，另輸出各工作表的結果檔
         value_cols (list[str]): 欄位名稱
         popmeans (dict, optional): {欄位名稱: 母體平均數}，若 None，則自動使用各欄位平均數
+        side_outputs (list[str], optional): 另存結果副本的格式，例如 ["csv", "parquet"]
     Returns:
         pd.DataFrame: 分析結果
     """
@@ -23,49 +26,33 @@ def one_sample_analysis(file_path, data, value_cols, popmeans=None):
     output_dir = os.path.join(base_folder, f"{base_name}_one_sample")
     os.makedirs(output_dir, exist_ok=True)
 
-    if popmeans is None:
-        popmeans = {col: data[col].mean() for col in value_cols}
-
-    results = []
-    power_calc = TTestPower()
-
-    for col in value_cols:
-        x = data[col].dropna()
-        popmean = popmeans.get(col, np.mean(x))
-
-        # 計算 t 檢定
-        t_stat, p_val = stats.ttest_1samp(x, popmean)
-        mean, sd = np.mean(x), np.std(x, ddof=1)
-        se = sd / np.sqrt(len(x))
-        df = len(x) - 1
-        ci = stats.t.interval(0.95, df, loc=mean, scale=se)
-        ll, ul = ci
-        d = (mean - popmean) / sd if sd != 0 else 0
-        power = power_calc.solve_power(effect_size=abs(d), nobs=len(x), alpha=0.05)
-
-        results.append({
-            "Variable": col,
-            "Mean": mean,
-            "SD": sd,
-            "t": t_stat,
-            "p": p_val,
-            "95%CI_LL": ll,
-            "95%CI_UL": ul,
-            "Cohen_d": d,
-            "1-β": power,
-        })
-
-    df_result = pd.DataFrame(results)
-
-    # 儲存 Excel
-    excel_path = os.path.join(output_dir, "one_sample_results.xlsx")
-    df_result.to_excel(excel_path, index=False)
-
-    # 儲存文字檔
-    text_path = os.path.join(output_dir, "summary.txt")
-    with open(text_path, "w", encoding="utf-8") as f:
-        f.write("=== 單一樣本 t 檢定結果 ===\n")
-        f.write(df_result.to_string(index=False))
+    sheets = data if isinstance(data, dict) else None
+    if sheets is not None:
+        record(rows=sum(len(df) for df in sheets.values()),
+               columns=max((df.shape[1] for df in sheets.values()), default=0))
+    else:
+        record(data)
+    with stage("compute") as s:
+        if sheets is not None:
+            tables = analyze_sheets(sheets, lambda df: one_sample_table(df, value_cols, popmeans))
+            df_result = combine_tables(tables)
+        else:
+            s.record(data)
+            df_result = one_sample_table(data, value_cols, popmeans)
+
+    with stage("write") as s:
+        s.record(df_result)
+        if sheets is not None:
+            write_sheet_tables(tables, output_dir, "one_sample_results.xlsx", side_outputs)
+        # 儲存 Excel
+        excel_path = os.path.join(output_dir, "one_sample_results.xlsx")
+        write_table(df_result, excel_path, side_outputs=side_outputs)
+
+        # 儲存文字檔
+        text_path = os.path.join(output_dir, "summary.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("=== 單一樣本 t 檢定結果 ===\n")
+            f.write(df_result.to_string(index=False))
 
     print(f"✅ 單一樣本檢定結果已輸出至：{output_dir}")
     return df_result
@@ -0,0 +1,134 @@
+"""
+PDF 報告用圖片：依目標 DPI 縮小並壓縮圖表，相同內容的圖片只處理一次。
+
+- 圖表 PNG 為含透明度的 RGBA，reportlab 每次組 PDF 都會解碼並重新以 zlib 壓縮，
+  另外產生透明遮罩。這裡先鋪上白底、縮到版面大小所需的像素（不放大），
+  預設存成 JPEG：reportlab 會把 JPEG 原封不動嵌入 PDF，不再重新編碼。
+- 處理後的圖片依「原圖內容 + 設定」的雜湊命名，存於 charts/pdf_images/，
+  內容相同的圖表（不論圖名、國家或重新執行）共用同一個檔案，
+  同一份 PDF 中也只嵌入一次。
+- 同一資料夾的多個活頁簿共用 pdf_images/；index.json 記錄每個活頁簿（或跨檔案彙總）
+  報告用到的圖片，record_pdf_images 只刪除沒有任何活頁簿使用的圖片。
+"""
+import hashlib
+import json
+import os
+import time
+from PIL import Image as PILImage
+
+PDF_IMAGE_DIR = "pdf_images"
+PDF_IMAGE_INDEX = "index.json"
+# dpi 為嵌入後的解析度（None 表示不縮小）；format 為 "jpeg" 或 "png"（無損）
+PDF_IMAGE_OPTIONS = {"dpi": 150, "format": "jpeg", "quality": 85}
+PDF_IMAGE_FORMATS = ("jpeg", "png")
+# 處理方式改變時遞增，使舊檔失效
+PDF_IMAGE_VERSION = 1
+
+
+def image_options(options=None):
+    """補齊預設值並檢查設定"""
+    options = {**PDF_IMAGE_OPTIONS, **(options or {})}
+    if options["format"] not in PDF_IMAGE_FORMATS:
+        raise ValueError(f"不支援的圖片格式：{options['format']}（可用 {', '.join(PDF_IMAGE_FORMATS)}）")
+    if options["dpi"] is not None and options["dpi"] <= 0:
+        raise ValueError("dpi 必須大於 0")
+    if not 1 <= options["quality"] <= 95:
+        raise ValueError("JPEG 品質必須介於 1 到 95")
+    return options
+
+
+def _image_key(img_path, width, height, options):
+    h = hashlib.sha256(repr((PDF_IMAGE_VERSION, width, height, options["dpi"], options["format"],
+                             options["quality"] if options["format"] == "jpeg" else None)).encode("utf-8"))
+    with open(img_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:32]
+
+
+def prepare_pdf_image(img_path, width, height, options=None, cache_dir=None):
+    """
+    回傳要嵌入 PDF 的圖片路徑。width、height 為在 PDF 中的顯示大小（點，1/72 英吋）。
+    cache_dir 預設為圖表資料夾下的 pdf_images/；已處理過的相同圖片直接沿用。
+    """
+    options = image_options(options)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(img_path), PDF_IMAGE_DIR)
+    ext = ".jpg" if options["format"] == "jpeg" else ".png"
+    out_path = os.path.join(cache_dir, _image_key(img_path, width, height, options) + ext)
+    if os.path.isfile(out_path):
+        os.utime(out_path)
+        return out_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with PILImage.open(img_path) as im:
+        im = im.convert("RGBA")
+        flat = PILImage.new("RGB", im.size, "white")
+        flat.paste(im, mask=im.getchannel("A"))
+    if options["dpi"] is not None:
+        size = (min(flat.width, round(width * options["dpi"] / 72)),
+                min(flat.height, round(height * options["dpi"] / 72)))
+        if size != flat.size:
+            flat = flat.resize(size, PILImage.LANCZOS)
+
+    # 多個行程可能同時處理相同圖片：各自寫入暫存檔再取代
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    if options["format"] == "jpeg":
+        flat.save(tmp_path, "JPEG", quality=options["quality"], optimize=True)
+    else:
+        flat.save(tmp_path, "PNG", optimize=True)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, PDF_IMAGE_INDEX), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir, index):
+    path = os.path.join(cache_dir, PDF_IMAGE_INDEX)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record_pdf_images(charts_dir, owner, used, since=None):
+    """
+    記錄 owner（活頁簿或彙總名稱）的報告用到的圖片（used 為 prepare_pdf_image 回傳的路徑或檔名）。
+    since 為 None 時（例如被取消的執行）只加入 owner 的清單；
+    否則以 used 取代 owner 的清單，並刪除沒有任何 owner 使用、且自 since 起未被使用的圖片。
+    回傳刪除數。
+    """
+    cache_dir = os.path.join(charts_dir, PDF_IMAGE_DIR)
+    if not os.path.isdir(cache_dir):
+        return 0
+    index = _load_index(cache_dir)
+    names = {os.path.basename(p) for p in used}
+    if since is None:
+        names.update(index.get(owner, []))
+    index[owner] = sorted(names)
+    _save_index(cache_dir, index)
+    if since is None:
+        return 0
+
+    keep = {name for owned in index.values() for name in owned}
+    keep.add(PDF_IMAGE_INDEX)
+    removed = 0
+    for entry in os.scandir(cache_dir):
+        # mtime 較新的圖片可能正被其他執行使用（尚未記錄）
+        if entry.is_file() and entry.name not in keep and entry.stat().st_mtime < since:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def pdf_image_timestamp():
+    """record_pdf_images 的起始時間（略往前以容忍檔案系統的時間精度）"""
+    return time.time() - 2
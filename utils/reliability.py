@@ -1,22 +1,108 @@
 import pandas as pd
 import numpy as np
+import os
 import re
-from tkinter import messagebox
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .loader import read_workbook_numeric
+from .instrument import trace_run, stage
+from .sheets import analyze_sheets, combine_tables
+
+DEFAULT_PREFIXES = {"E", "CE", "PP", "FWS", "R"}
+
+def _as_matrix(df_subset):
+    """Return complete-case float matrix (n, k) for the given items"""
+    try:
+        values = df_subset.to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        values = df_subset.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    return values[~np.isnan(values).any(axis=1)]
+
+def _covariance(values):
+    """Sample covariance matrix (ddof=1) of an (n, k) matrix in one pass"""
+    n = values.shape[0]
+    if n < 2:
+        return np.zeros((values.shape[1], values.shape[1]))
+    centered = values - values.mean(axis=0)
+    return centered.T @ centered / (n - 1)
+
+def alpha_from_cov(cov):
+    """
+    Closed-form reliability statistics from item covariance matrix (..., k, k).
+    Returns (alpha, alpha_if_deleted, corrected_item_total_corr); leading
+    dimensions are kept so a stack of matrices is handled in one call.
+    Values that cannot be calculated are returned as 0.
+    """
+    cov = np.asarray(cov, dtype=float)
+    k = cov.shape[-1]
+    diag = np.diagonal(cov, axis1=-2, axis2=-1)
+    row_sum = cov.sum(axis=-1)
+    total_var = row_sum.sum(axis=-1)
+    item_var = diag.sum(axis=-1)
+    # total variance of the scale without item i
+    rest_var = total_var[..., None] - 2 * row_sum + diag
+    rest_item_var = item_var[..., None] - diag
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if k >= 2:
+            alpha = (k / (k - 1)) * (1 - item_var / total_var)
+            corr = (row_sum - diag) / np.sqrt(diag * rest_var)
+        else:
+            alpha = np.zeros(total_var.shape)
+            corr = np.zeros(diag.shape)
+        if k >= 3:
+            alpha_deleted = ((k - 1) / (k - 2)) * (1 - rest_item_var / rest_var)
+        else:
+            alpha_deleted = np.zeros(diag.shape)
+
+    alpha = np.where(total_var > 0, alpha, 0.0)
+    alpha_deleted = np.where(rest_var > 0, alpha_deleted, 0.0)
+    corr = np.nan_to_num(corr, nan=0.0, posinf=0.0, neginf=0.0)
+    return alpha, alpha_deleted, corr
+
+def reliability_stats(df_subset):
+    """Overall alpha, alpha-if-item-deleted and corrected item-total correlations in one matrix pass"""
+    values = _as_matrix(df_subset)
+    return alpha_from_cov(_covariance(values))
+
+def cronbach_alpha_bootstrap(df_subset, n_boot=1000, ci=0.95, seed=None, chunk_size=None):
+    """
+    Percentile bootstrap CIs for overall alpha and alpha-if-item-deleted.
+    All resamples are drawn up front as one (n_boot, n) index array; the
+    covariance matrices are then computed chunk_size replicates at a time.
+    Returns ((alpha_ll, alpha_ul), (deleted_ll, deleted_ul)).
+    """
+    values = _as_matrix(df_subset)
+    n, k = values.shape
+    if n < 2 or n_boot < 1:
+        nan_items = np.full(k, np.nan)
+        return (np.nan, np.nan), (nan_items, nan_items)
+
+    rng = np.random.default_rng(seed)
+    index_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    indices = rng.integers(0, n, size=(n_boot, n), dtype=index_dtype)
+    if chunk_size is None:
+        # keep each (chunk, n, k) resample block around 64 MB
+        chunk_size = max(1, (64 * 1024 ** 2) // (n * k * 8))
+
+    boot_alpha = np.empty(n_boot)
+    boot_deleted = np.empty((n_boot, k))
+    for start in range(0, n_boot, chunk_size):
+        stop = min(start + chunk_size, n_boot)
+        sample = values[indices[start:stop]]
+        centered = sample - sample.mean(axis=1, keepdims=True)
+        cov = np.matmul(centered.transpose(0, 2, 1), centered) / (n - 1)
+        boot_alpha[start:stop], boot_deleted[start:stop], _ = alpha_from_cov(cov)
+
+    q = [(1 - ci) / 2 * 100, (1 + ci) / 2 * 100]
+    alpha_ll, alpha_ul = np.percentile(boot_alpha, q)
+    deleted_ll, deleted_ul = np.percentile(boot_deleted, q, axis=0)
+    return (alpha_ll, alpha_ul), (deleted_ll, deleted_ul)
 
 def cronbach_alpha(df_subset):
     """Calculate Cronbach's Alpha; return 0 if cannot calculate"""
     try:
-        df_subset = df_subset.dropna()
-        k = len(df_subset.columns)
-        if k < 2:
-            return 0
-        item_var = df_subset.var(axis=0, ddof=1)
-        total_scores = df_subset.sum(axis=1)
-        total_var = total_scores.var(ddof=1)
-        if total_var == 0:
-            return 0
-        alpha = (k / (k - 1)) * (1 - item_var.sum() / total_var)
-        return alpha
+        alpha, _, _ = reliability_stats(df_subset)
+        return float(alpha)
     except:
         return 0
 
@@ -34,47 +120,151 @@ def filter_columns_by_prefix(df, target_prefixes):
                 groups[prefix].append(col)
     return groups
 
-def reliability_table(df_subset, scale_name):
-    """Generate reliability table for a single scale"""
-    alpha_total = cronbach_alpha(df_subset)
+def reliability_table(df_subset, scale_name, n_boot=0, ci=0.95, seed=None, chunk_size=None):
+    """Generate reliability table for a single scale; n_boot > 0 adds bootstrap CIs"""
+    try:
+        alpha_total, alpha_deleted, corr = reliability_stats(df_subset)
+    except:
+        k = len(df_subset.columns)
+        alpha_total, alpha_deleted, corr = 0, np.zeros(k), np.zeros(k)
     results = []
-    first = True
-    for col in df_subset.columns:
-        try:
-            if len(df_subset.columns) > 1:
-                total_minus_item = df_subset.drop(columns=[col]).sum(axis=1)
-                corr = df_subset[col].corr(total_minus_item)
-                alpha_if_deleted = cronbach_alpha(df_subset.drop(columns=[col]))
-            else:
-                corr = 0
-                alpha_if_deleted = 0
-        except:
-            corr = 0
-            alpha_if_deleted = 0
+    for i, col in enumerate(df_subset.columns):
+        first = i == 0
         results.append({
             "Scale": scale_name if first else "",
             "Item": col,
-            "Corrected Item-Total Correlation": round(corr,4) if not pd.isna(corr) else 0,
-            "Cronbach's Alpha if Item Deleted": round(alpha_if_deleted,4) if not pd.isna(alpha_if_deleted) else 0,
-            "Overall Cronbach's Alpha": round(alpha_total,4) if first else ""
+            "Corrected Item-Total Correlation": round(float(corr[i]),4),
+            "Cronbach's Alpha if Item Deleted": round(float(alpha_deleted[i]),4),
+            "Overall Cronbach's Alpha": round(float(alpha_total),4) if first else ""
         })
-        first = False
-    return pd.DataFrame(results)
+    table = pd.DataFrame(results)
+
+    if n_boot > 0:
+        (alpha_ll, alpha_ul), (deleted_ll, deleted_ul) = cronbach_alpha_bootstrap(
+            df_subset, n_boot=n_boot, ci=ci, seed=seed, chunk_size=chunk_size)
+        label = f"{ci * 100:g}%CI"
+        table[f"Alpha if Item Deleted {label}_LL"] = np.round(deleted_ll, 4)
+        table[f"Alpha if Item Deleted {label}_UL"] = np.round(deleted_ul, 4)
+        table[f"Overall Alpha {label}_LL"] = [round(float(alpha_ll),4)] + [""] * (len(table) - 1)
+        table[f"Overall Alpha {label}_UL"] = [round(float(alpha_ul),4)] + [""] * (len(table) - 1)
+    return table
 
-def reliability_analysis(df, target_prefixes=None):
+def reliability_analysis(df, target_prefixes=None, n_boot=0, seed=None):
     """Analyze multiple scales and return combined table"""
     if target_prefixes is None:
-        target_prefixes = {"E", "CE", "PP", "FWS", "R"}
-    groups = filter_columns_by_prefix(df, target_prefixes)
-    if not groups:
-        messagebox.showerror("Error", "No columns matched the target prefixes!")
-        return pd.DataFrame()
-    
-    all_tables = []
-    for name, cols in groups.items():
-        sub_df = df[cols]
-        table = reliability_table(sub_df, name)
-        all_tables.append(table)
-    
-    combined = pd.concat(all_tables, ignore_index=True)
+        target_prefixes = DEFAULT_PREFIXES
+    with trace_run("reliability_analysis") as run:
+        run.record(df)
+        with stage("clean"):
+            groups = filter_columns_by_prefix(df, target_prefixes)
+        if not groups:
+            from tkinter import messagebox
+            messagebox.showerror("Error", "No columns matched the target prefixes!")
+            return pd.DataFrame()
+
+        with stage("compute") as s:
+            all_tables = []
+            for name, cols in groups.items():
+                sub_df = df[cols]
+                table = reliability_table(sub_df, name, n_boot=n_boot, seed=seed)
+                all_tables.append(table)
+
+            combined = pd.concat(all_tables, ignore_index=True)
+            s.record(combined)
     return combined
+
+def _scale_tables(df_numeric, target_prefixes, n_boot=0, seed=None):
+    """Reliability tables for every matching scale of one sheet, keyed by a Scale column"""
+    tables = []
+    for name, cols in filter_columns_by_prefix(df_numeric, target_prefixes).items():
+        table = reliability_table(df_numeric[cols], name, n_boot=n_boot, seed=seed)
+        table["Scale"] = name
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+def _reliability_file_job(file_path, target_prefixes, n_boot=0, seed=None, all_sheets=False):
+    """
+    Worker: read one workbook and build keyed tables for every matching scale.
+    With all_sheets the workbook is opened once, every sheet is analyzed
+    concurrently, and the pooled rows of all sheets are analyzed as well.
+    """
+    with trace_run("reliability_analysis_batch", file_path) as run:
+        with stage("read"):
+            data = read_workbook_numeric(file_path, sheet_name=None if all_sheets else 0)
+        if all_sheets:
+            run.record(rows=sum(len(df) for df in data.values()),
+                       columns=max((df.shape[1] for df in data.values()), default=0))
+        else:
+            run.record(data)
+        with stage("compute") as s:
+            if all_sheets:
+                tables = analyze_sheets(data, lambda df: _scale_tables(df, target_prefixes, n_boot, seed))
+                table = combine_tables(tables)
+            else:
+                table = _scale_tables(data, target_prefixes, n_boot, seed)
+            s.record(table)
+    if table.empty:
+        return []
+    table.insert(0, "File", os.path.basename(file_path))
+    return [table]
+
+def reliability_analysis_batch(file_paths, target_prefixes=None, max_workers=None, n_boot=0, seed=None,
+                               progress=None, cancel=None, all_sheets=False):
+    """
+    Analyze every scale of many workbooks in a process pool.
+    Returns one combined table keyed by File and Scale (files that fail
+    to read or have no matching columns are reported and skipped).
+    all_sheets analyzes every sheet of each workbook (plus all sheets
+    pooled) from a single parse and adds a Sheet key column.
+    progress(done, total, path) is called after each file; setting the
+    cancel event (threading.Event) skips files that have not started yet.
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    if target_prefixes is None:
+        target_prefixes = DEFAULT_PREFIXES
+
+    results = {}
+    done = 0
+
+    def report(path):
+        nonlocal done
+        done += 1
+        if progress is not None:
+            progress(done, len(file_paths), path)
+
+    if len(file_paths) == 1 or max_workers == 1:
+        for path in file_paths:
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                results[path] = _reliability_file_job(path, target_prefixes, n_boot, seed, all_sheets)
+            except Exception as e:
+                print(f"Failed to analyze {path}: {e}")
+            report(path)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_reliability_file_job, path, target_prefixes, n_boot, seed, all_sheets): path
+                       for path in file_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    print(f"Failed to analyze {path}: {e}")
+                report(path)
+                if cancel is not None and cancel.is_set():
+                    for pending in futures:
+                        pending.cancel()
+
+    for path, tables in results.items():
+        if not tables:
+            print(f"No columns matched the target prefixes in {path}")
+
+    # keep the input file order regardless of completion order
+    all_tables = [t for path in file_paths for t in results.get(path, [])]
+    if not all_tables:
+        return pd.DataFrame()
+    return pd.concat(all_tables, ignore_index=True)
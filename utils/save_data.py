@@ -1,18 +1,10 @@
 import os
-from tkinter import messagebox, simpledialog
-import pandas as pd
+import re
+from xml.sax.saxutils import escape
+from .instrument import traced, stage
+from .writer import write_table, write_side_outputs
 
-# Optional dependencies
-try:
-    from docx import Document
-except ImportError:
-    Document = None
-
-try:
-    from pptx import Presentation
-    from pptx.util import Inches
-except ImportError:
-    Presentation = None
+PPTX_ROWS_PER_SLIDE = 15
 
 def select_file(title="Select file"):
     from tkinter import Tk, filedialog
@@ -29,7 +21,133 @@ def select_file(title="Select file"):
     root.destroy()
     return file_path
 
-def save_data(df, original_file_path, custom_name=None):
+# characters that are not allowed in WordprocessingML text
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _docx_rows_xml(rows, widths):
+    """Build <w:tr> markup for many rows at once (text escaped, widths copied from the header)"""
+    parts = []
+    for row in rows:
+        parts.append("<w:tr>")
+        for width, value in zip(widths, row):
+            text = escape(_INVALID_XML_CHARS.sub("", str(value)))
+            parts.append(
+                f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>'
+                f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p></w:tc>'
+            )
+        parts.append("</w:tr>")
+    return "".join(parts)
+
+def write_docx(df, output_path, rows_per_table=None, chunk_rows=500):
+    """
+    Write df as Word table(s). Body rows are generated as XML in bulk
+    instead of setting table.cell(i, j).text per cell; rows_per_table
+    splits large results into several tables, each with its own header.
+    """
+    # Optional dependency, imported on first use
+    try:
+        from docx import Document
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls
+    except ImportError:
+        raise ImportError("python-docx not installed!")
+    doc = Document()
+    doc.add_heading("Data Output", level=1)
+
+    n_rows = df.shape[0]
+    rows_per_table = rows_per_table or max(n_rows, 1)
+    n_tables = max(1, -(-n_rows // rows_per_table))
+    records = df.itertuples(index=False, name=None)
+
+    for t in range(n_tables):
+        if t > 0:
+            doc.add_paragraph(f"Data Output ({t + 1}/{n_tables})")
+        table = doc.add_table(rows=1, cols=df.shape[1])
+        for j, col_name in enumerate(df.columns):
+            table.cell(0, j).text = str(col_name)
+        widths = [tc.xpath("./w:tcPr/w:tcW/@w:w")[0] for tc in table._tbl.tr_lst[0].tc_lst]
+
+        remaining = min(rows_per_table, n_rows - t * rows_per_table)
+        while remaining > 0:
+            batch = [next(records) for _ in range(min(chunk_rows, remaining))]
+            remaining -= len(batch)
+            fragment = parse_xml(f"<w:tbl {nsdecls('w')}>{_docx_rows_xml(batch, widths)}</w:tbl>")
+            table._tbl.extend(list(fragment))
+
+    doc.save(output_path)
+    return output_path
+
+def write_pptx(df, output_path, rows_per_slide=PPTX_ROWS_PER_SLIDE, font_size=10):
+    """
+    Write df as native PowerPoint tables, paginated over as many slides as
+    needed. Rows are streamed once from the DataFrame; each slide only
+    formats its own rows_per_slide rows.
+    """
+    # Optional dependency, imported on first use
+    try:
+        from pptx import Presentation
+        from pptx.util import Inches, Pt
+    except ImportError:
+        raise ImportError("python-pptx not installed!")
+    prs = Presentation()
+    slide_layout = prs.slide_layouts[5]  # title only layout
+    n_rows, n_cols = df.shape
+    n_slides = max(1, -(-n_rows // rows_per_slide))
+    headers = [str(c) for c in df.columns]
+    records = df.itertuples(index=False, name=None)
+
+    left, top = Inches(0.5), Inches(1.4)
+    width = prs.slide_width - 2 * left
+    row_height = Inches(0.3)
+
+    def fill(cell, text, bold=False):
+        run = cell.text_frame.paragraphs[0].add_run()
+        run.text = text
+        run.font.size = Pt(font_size)
+        run.font.bold = bold
+
+    for page in range(n_slides):
+        slide = prs.slides.add_slide(slide_layout)
+        title = "Data Output" if n_slides == 1 else f"Data Output ({page + 1}/{n_slides})"
+        slide.shapes.title.text = title
+
+        rows_here = min(rows_per_slide, n_rows - page * rows_per_slide)
+        shape = slide.shapes.add_table(rows_here + 1, n_cols, left, top, width, row_height * (rows_here + 1))
+        table = shape.table
+        for j, header in enumerate(headers):
+            fill(table.cell(0, j), header, bold=True)
+        for i in range(1, rows_here + 1):
+            for j, value in enumerate(next(records)):
+                fill(table.cell(i, j), str(value))
+
+    prs.save(output_path)
+    return output_path
+
+@traced("write_output", file_arg=1)
+def write_output(df, output_path, rows_per_table=None, rows_per_slide=None, side_outputs=None):
+    """
+    Write df to output_path by extension (.xlsx/.xls/.docx/.pptx); raises on failure.
+    Excel files are streamed row by row; side_outputs (e.g. ["csv", "parquet"])
+    also writes copies of the table next to output_path.
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    with stage("write") as s:
+        s.record(df)
+        if ext in [".xlsx", ".xls"]:
+            write_table(df, output_path)
+
+        elif ext == ".docx":
+            write_docx(df, output_path, rows_per_table=rows_per_table)
+
+        elif ext == ".pptx":
+            write_pptx(df, output_path, rows_per_slide=rows_per_slide or PPTX_ROWS_PER_SLIDE)
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+        write_side_outputs(df, output_path, side_outputs)
+    return output_path
+
+def save_data(df, original_file_path, custom_name=None, rows_per_table=None, rows_per_slide=None):
+    from tkinter import Tk, messagebox, simpledialog
     if original_file_path is None:
         messagebox.showerror("Error", "Original file path not provided!")
         return
@@ -38,7 +156,6 @@ def save_data(df, original_file_path, custom_name=None):
     basename, ext = os.path.splitext(os.path.basename(original_file_path))
     
     if not custom_name:
-        from tkinter import Tk
         root = Tk()
         root.withdraw()
         custom_name = simpledialog.askstring("Save As", "Enter file name:", initialvalue=f"{basename}_轉製版")
@@ -49,52 +166,15 @@ def save_data(df, original_file_path, custom_name=None):
 
     output_path = os.path.join(folder, f"{custom_name}{ext}")
 
-    try:
-        if ext in [".xlsx", ".xls"]:
-            if df is None:
-                messagebox.showerror("Error", "No DataFrame to save!")
-                return
-            df.to_excel(output_path, index=False)
-
-        elif ext == ".docx":
-            if Document is None:
-                messagebox.showerror("Error", "python-docx not installed!")
-                return
-            if df is None:
-                messagebox.showerror("Error", "No DataFrame to save!")
-                return
-            doc = Document()
-            doc.add_heading("Data Output", level=1)
-            table = doc.add_table(rows=df.shape[0]+1, cols=df.shape[1])
-            for j, col_name in enumerate(df.columns):
-                table.cell(0, j).text = str(col_name)
-            for i in range(df.shape[0]):
-                for j in range(df.shape[1]):
-                    table.cell(i+1, j).text = str(df.iloc[i,j])
-            doc.save(output_path)
-
-        elif ext == ".pptx":
-            if Presentation is None:
-                messagebox.showerror("Error", "python-pptx not installed!")
-                return
-            if df is None:
-                messagebox.showerror("Error", "No DataFrame to save!")
-                return
-            prs = Presentation()
-            slide_layout = prs.slide_layouts[5]  # blank layout
-            slide = prs.slides.add_slide(slide_layout)
-            left = top = Inches(1)
-            width = Inches(8)
-            height = Inches(5)
-            textbox = slide.shapes.add_textbox(left, top, width, height)
-            tf = textbox.text_frame
-            tf.word_wrap = True
-            tf.text = df.to_string(index=False)
-            prs.save(output_path)
-        else:
-            messagebox.showerror("Error", f"Unsupported file type: {ext}")
-            return
+    if ext not in [".xlsx", ".xls", ".docx", ".pptx"]:
+        messagebox.showerror("Error", f"Unsupported file type: {ext}")
+        return
+    if df is None:
+        messagebox.showerror("Error", "No DataFrame to save!")
+        return
 
+    try:
+        write_output(df, output_path, rows_per_table=rows_per_table, rows_per_slide=rows_per_slide)
         messagebox.showinfo("Done", f"File saved to:\n{output_path}")
         try:
             os.startfile(output_path)
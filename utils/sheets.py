@@ -0,0 +1,78 @@
+"""
+多工作表分析：活頁簿只解析一次，各工作表的分析以執行緒同時進行，
+結果再合併為含「Sheet」欄位的總表。
+
+ALL_SHEETS 為合併所有工作表資料後（例如各班合計）的分析結果所使用的名稱。
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from .writer import write_table
+
+ALL_SHEETS = "全部工作表"
+SHEET_COL = "Sheet"
+
+
+def map_sheets(func, sheets, max_workers=None):
+    """
+    對每個工作表同時執行 func(名稱, DataFrame)，回傳 {名稱: 結果}（依活頁簿順序）。
+    單一工作表失敗時印出訊息並略過，不影響其他工作表。
+    """
+    results = {}
+    if not sheets:
+        return results
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(sheets), os.cpu_count() or 1)) as pool:
+        futures = {name: pool.submit(func, name, df) for name, df in sheets.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"⚠️ 工作表 {name} 分析失敗：{e}")
+    return results
+
+
+def pool_sheets(sheets):
+    """合併所有工作表的資料列（欄位取聯集）；sheets 可為 {名稱: DataFrame} 或 DataFrame 清單"""
+    frames = list(sheets.values()) if isinstance(sheets, dict) else list(sheets)
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+
+def combine_tables(tables, position=0):
+    """將 {工作表名稱: 結果表} 合併為一張表，並在第 position 欄插入 Sheet 欄位"""
+    frames = []
+    for name, table in tables.items():
+        if table is None or table.empty:
+            continue
+        table = table.copy()
+        table.insert(position, SHEET_COL, name)
+        frames.append(table)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def analyze_sheets(sheets, table_func, max_workers=None):
+    """
+    以 table_func(DataFrame) 同時分析每個工作表，工作表多於一個時
+    另外分析合併後的全部資料（名稱為 ALL_SHEETS）。回傳 {名稱: 結果表}。
+    """
+    tables = map_sheets(lambda name, df: table_func(df), sheets, max_workers)
+    if len(sheets) > 1:
+        try:
+            tables[ALL_SHEETS] = table_func(pool_sheets(sheets))
+        except Exception as e:
+            print(f"⚠️ 合併工作表分析失敗：{e}")
+    return tables
+
+
+def write_sheet_tables(tables, output_dir, file_name, side_outputs=None):
+    """各工作表結果分別存成 {工作表}_{file_name}"""
+    for name, table in tables.items():
+        write_table(table, os.path.join(output_dir, f"{safe_sheet_name(name)}_{file_name}"),
+                    side_outputs=side_outputs)
+
+
+def safe_sheet_name(name):
+    """工作表名稱轉為可用於檔名與資料夾名稱的字串"""
+    return re.sub(r'[\\/:*?"<>|]', "_", str(name)).strip() or "sheet"
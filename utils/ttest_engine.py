@@ -0,0 +1,220 @@
+"""
+批次 t 檢定引擎：一次計算所有選取欄位的平均數、標準差、t 值、p 值、
+95% 信賴區間、Cohen's d 與檢定力。
+
+資料先轉為 (樣本數, 欄位數) 的矩陣，以 NaN 遮罩逐欄略過缺失值，
+所有統計量皆以軸向 NumPy/SciPy 運算完成，不再逐欄呼叫 stats.ttest_*。
+"""
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+CONFIDENCE = 0.95
+ALPHA = 0.05
+POWER_CACHE_SIZE = 4096
+
+# (independent, effect_size, nobs, alpha) -> power
+_power_cache = OrderedDict()
+
+
+def _numeric_matrix(df, cols):
+    """欄位轉為 float 矩陣；非數值內容視為缺失值"""
+    try:
+        return df[cols].to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return df[cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+
+def _describe(x):
+    """逐欄有效樣本數、平均數與標準差 (ddof=1)，略過 NaN"""
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, x, 0).sum(axis=0) / n
+        sq = np.where(valid, x - mean, 0) ** 2
+        sd = np.sqrt(sq.sum(axis=0) / (n - 1))
+    return n, mean, sd
+
+
+def _t_interval(diff, se, dof):
+    """等同 stats.t.interval(CONFIDENCE, dof, loc=diff, scale=se)；se 非正數時為 NaN"""
+    with np.errstate(invalid='ignore'):
+        margin = np.where(se > 0, stats.t.ppf((1 + CONFIDENCE) / 2, dof) * se, np.nan)
+    return diff - margin, diff + margin
+
+
+def _two_sided_p(t_stat, dof):
+    with np.errstate(invalid='ignore'):
+        return 2 * stats.t.sf(np.abs(t_stat), dof)
+
+
+def _noncentral_t_power(effect_size, nobs, alpha, independent):
+    """
+    雙尾 t 檢定檢定力的封閉解（非中心 t 分配），與 statsmodels
+    TTestPower / TTestIndPower(ratio=1) 的 power 相同，但不經由求根器。
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if independent:
+            # 兩組人數皆為 nobs：自由度 2n-2，有效樣本數 n/2
+            dof = 2 * nobs - 2
+            nc = effect_size * np.sqrt(nobs / 2)
+        else:
+            dof = nobs - 1
+            nc = effect_size * np.sqrt(nobs)
+        crit = stats.t.isf(alpha / 2, dof)
+        power = stats.nct.sf(crit, dof, nc) + stats.nct.cdf(-crit, dof, nc)
+    return np.where(np.isnan(crit), np.nan, power)
+
+
+def ttest_power(effect_sizes, nobs, alpha=ALPHA, independent=False):
+    """
+    逐欄雙尾 t 檢定檢定力（向量化）。independent=True 時 nobs 為第一組人數。
+    結果以 (independent, |效果量|, 樣本數, alpha) 為鍵保存於 LRU 快取，
+    只有快取中沒有的組合才重新計算。
+    """
+    effect_sizes, nobs = np.broadcast_arrays(np.abs(np.asarray(effect_sizes, dtype=float)),
+                                             np.asarray(nobs, dtype=float))
+    keys = [(independent, e, n, alpha) for e, n in zip(effect_sizes.tolist(), nobs.tolist())]
+    power = np.empty(len(keys))
+
+    missing = []
+    for i, key in enumerate(keys):
+        if key in _power_cache:
+            _power_cache.move_to_end(key)
+            power[i] = _power_cache[key]
+        else:
+            missing.append(i)
+
+    if missing:
+        power[missing] = _noncentral_t_power(effect_sizes[missing], nobs[missing], alpha, independent)
+        for i in missing:
+            _power_cache[keys[i]] = power[i]
+        while len(_power_cache) > POWER_CACHE_SIZE:
+            _power_cache.popitem(last=False)
+    return power
+
+
+def clear_power_cache():
+    _power_cache.clear()
+
+
+def one_sample_table(data, value_cols, popmeans=None):
+    """
+    單一樣本 t 檢定（所有欄位一次計算）
+    popmeans: {欄位名稱: 母體平均數}；未指定的欄位使用該欄位平均數
+    """
+    x = _numeric_matrix(data, value_cols)
+    n, mean, sd = _describe(x)
+    popmeans = popmeans or {}
+    popmean = np.array([popmeans.get(col, m) for col, m in zip(value_cols, mean)], dtype=float)
+
+    dof = n - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = sd / np.sqrt(n)
+        t_stat = (mean - popmean) / se
+        d = np.where(sd != 0, (mean - popmean) / sd, 0.0)
+    ll, ul = _t_interval(mean, se, dof)
+
+    return pd.DataFrame({
+        "Variable": value_cols,
+        "Mean": mean,
+        "SD": sd,
+        "t": t_stat,
+        "p": _two_sided_p(t_stat, dof),
+        "95%CI_LL": ll,
+        "95%CI_UL": ul,
+        "Cohen_d": d,
+        "1-β": ttest_power(d, n),
+    })
+
+
+def independent_table(df, group_col, value_cols):
+    """獨立樣本 t 檢定（Welch t；Cohen's d 使用合併標準差），所有欄位一次計算"""
+    # 確保組別按數字小到大
+    groups = sorted(df[group_col].dropna().unique())
+    if len(groups) != 2:
+        raise ValueError("分組欄位必須恰好兩組")
+
+    group1, group2 = groups
+    x = _numeric_matrix(df, value_cols)
+    n1, mean1, sd1 = _describe(x[(df[group_col] == group1).to_numpy()])
+    n2, mean2, sd2 = _describe(x[(df[group_col] == group2).to_numpy()])
+
+    diff = mean1 - mean2
+    v1, v2 = sd1 ** 2 / n1, sd2 ** 2 / n2
+    se = np.sqrt(v1 + v2)
+    df_t = n1 + n2 - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = diff / se
+        welch_df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+        pooled_sd = np.sqrt(((n1 - 1) * sd1 ** 2 + (n2 - 1) * sd2 ** 2) / df_t)
+        d = diff / pooled_sd
+    ll, ul = _t_interval(diff, se, df_t)
+
+    return pd.DataFrame({
+        "Variable": value_cols,
+        "M1": mean1,
+        "SD1": sd1,
+        "M2": mean2,
+        "SD2": sd2,
+        "t": t_stat,
+        "p": _two_sided_p(t_stat, welch_df),
+        "95%CI_LL": ll,
+        "95%CI_UL": ul,
+        "Cohen_d": d,
+        "1-β": ttest_power(d, n1, independent=True),
+    })
+
+
+def paired_table(df, target_cols, group_col=None):
+    """
+    成對樣本 t 檢定，所有欄位一次計算。
+    指定 group_col 時以兩組資料對照，否則整個欄位自身對照；
+    缺失值與長度不足的部分補 0（與逐欄版本相同）。
+    """
+    if group_col and group_col in df.columns:
+        groups = sorted(df[group_col].dropna().unique())
+        if len(groups) != 2:
+            raise ValueError("分組欄位必須恰好兩組")
+        g1, g2 = groups
+        df1 = df[df[group_col] == g1]
+        df2 = df[df[group_col] == g2]
+    else:
+        # 若沒有指定分組欄位，直接對整個欄位做成對
+        df1 = df2 = df
+
+    cols = [col for col in target_cols if col in df.columns]
+    x1 = np.nan_to_num(_numeric_matrix(df1, cols), nan=0.0)
+    x2 = np.nan_to_num(_numeric_matrix(df2, cols), nan=0.0)
+
+    # 對齊長度，不足補 0
+    max_len = max(len(x1), len(x2))
+    x1 = np.pad(x1, ((0, max_len - len(x1)), (0, 0)))
+    x2 = np.pad(x2, ((0, max_len - len(x2)), (0, 0)))
+
+    n = np.full(len(cols), max_len)
+    _, m1, sd1 = _describe(x1)
+    _, m2, sd2 = _describe(x2)
+    _, diff, sd_diff = _describe(x1 - x2)
+    dfree = n - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = diff / (sd_diff / np.sqrt(n))
+        se = np.sqrt(sd1 ** 2 / n + sd2 ** 2 / n)
+        pooled_sd = np.where((sd1 > 0) | (sd2 > 0), np.sqrt((sd1 ** 2 + sd2 ** 2) / 2), 0.0)
+        d = np.where(pooled_sd != 0, diff / pooled_sd, 0.0)
+    ll, ul = _t_interval(diff, se, dfree)
+
+    return pd.DataFrame({
+        "Variable": cols,
+        "M1": m1,
+        "SD1": sd1,
+        "M2": m2,
+        "SD2": sd2,
+        "t": t_stat,
+        "p": _two_sided_p(t_stat, dfree),
+        "95%CI_LL": ll,
+        "95%CI_UL": ul,
+        "Cohen_d": d,
+        "1-β": ttest_power(d, n),
+    })
@@ -0,0 +1,119 @@
+"""
+共用結果輸出：以固定記憶體的串流方式寫出 Excel，並可另存 CSV / Parquet 副本。
+
+DataFrame.to_excel 會先在記憶體中建立整本 openpyxl 活頁簿（每個儲存格一個物件）
+再存檔；這裡改為逐批把列寫入：安裝 xlsxwriter 時使用其 constant_memory 模式，
+否則使用 openpyxl 的 write_only 模式，兩者寫完的列都會直接寫到暫存檔。
+輸出內容與 to_excel(index=False) 相同（缺失值為空白、inf 寫成文字、日期時間格式一致）。
+"""
+import os
+import numpy as np
+
+WRITE_CHUNK_ROWS = 5000
+SIDE_FORMATS = ("csv", "parquet")
+# 與 pandas to_excel 的預設日期時間格式相同
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+
+
+def _row_chunks(df, chunk_rows):
+    """逐批產生可直接寫入儲存格的列：缺失值為 None，±inf 為文字（同 to_excel 的 inf_rep）"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        values = chunk.to_numpy(dtype=object, copy=True)
+        values[chunk.isna().to_numpy()] = None
+        for j, dtype in enumerate(chunk.dtypes):
+            if dtype.kind == "f":
+                col = chunk.iloc[:, j].to_numpy()
+                values[np.isposinf(col), j] = "inf"
+                values[np.isneginf(col), j] = "-inf"
+        yield values.tolist()
+
+
+def _write_xlsxwriter(xlsxwriter, df, output_path, sheet_name, chunk_rows):
+    wb = xlsxwriter.Workbook(output_path, {
+        "constant_memory": True, "default_date_format": DATETIME_FORMAT,
+        # 與 openpyxl 相同：不自動把網址字串轉成超連結
+        "strings_to_urls": False,
+    })
+    try:
+        ws = wb.add_worksheet(sheet_name)
+        ws.write_row(0, 0, list(df.columns))
+        r = 1
+        for rows in _row_chunks(df, chunk_rows):
+            for row in rows:
+                ws.write_row(r, 0, row)
+                r += 1
+    finally:
+        wb.close()
+
+
+def _write_openpyxl(df, output_path, sheet_name, chunk_rows):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(list(df.columns))
+    # 只有日期時間欄位需要逐格指定顯示格式
+    datetime_cols = [j for j, dtype in enumerate(df.dtypes) if dtype.kind == "M"]
+    for rows in _row_chunks(df, chunk_rows):
+        for row in rows:
+            for j in datetime_cols:
+                if row[j] is not None:
+                    cell = WriteOnlyCell(ws, value=row[j])
+                    cell.number_format = DATETIME_FORMAT
+                    row[j] = cell
+            ws.append(row)
+    wb.save(output_path)
+
+
+def write_excel(df, output_path, sheet_name="Sheet1", chunk_rows=WRITE_CHUNK_ROWS):
+    """以串流方式將 df 寫成 .xlsx（不含索引），回傳輸出路徑"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+    if xlsxwriter is not None:
+        _write_xlsxwriter(xlsxwriter, df, output_path, sheet_name, chunk_rows)
+    else:
+        _write_openpyxl(df, output_path, sheet_name, chunk_rows)
+    return output_path
+
+
+def write_side_outputs(df, output_path, formats):
+    """在 output_path 旁另存同名的 .csv / .parquet 副本，回傳副本路徑"""
+    stem = os.path.splitext(output_path)[0]
+    paths = []
+    for fmt in formats or ():
+        fmt = fmt.lower().lstrip(".")
+        path = f"{stem}.{fmt}"
+        if fmt == "csv":
+            # utf-8-sig 讓 Excel 正確顯示中文
+            df.to_csv(path, index=False, encoding="utf-8-sig")
+        elif fmt == "parquet":
+            # 需要 pyarrow 或 fastparquet；欄位名稱須為字串
+            df.rename(columns=str).to_parquet(path, index=False)
+        else:
+            raise ValueError(f"不支援的副本格式：{fmt}（可用 {', '.join(SIDE_FORMATS)}）")
+        paths.append(path)
+    return paths
+
+
+def write_table(df, output_path, side_outputs=None, sheet_name="Sheet1"):
+    """
+    依副檔名寫出結果表（.xlsx 以串流方式寫入，.csv / .parquet 直接輸出），
+    side_outputs 為另存副本的格式，例如 ("csv", "parquet")。回傳主檔路徑。
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        write_excel(df, output_path, sheet_name=sheet_name)
+    elif ext == ".csv":
+        write_side_outputs(df, output_path, ["csv"])
+    elif ext == ".parquet":
+        write_side_outputs(df, output_path, ["parquet"])
+    else:
+        # 其他格式（例如 .xls）交由 pandas 處理
+        df.to_excel(output_path, index=False)
+    formats = [f for f in side_outputs or () if "." + f.lower().lstrip(".") != ext]
+    write_side_outputs(df, output_path, formats)
+    return output_path